@@ -6,24 +6,64 @@ Run locally:
 """
 
 import os
+import csv
+import io
+import bisect
+import gzip
+import base64
+import struct
+import zlib
 import sqlite3
 import json
 import time
+import queue
+import signal
+import sys
+import re
 import logging
-from datetime import datetime
-from typing import List, Dict
-
-from fastapi import FastAPI, BackgroundTasks
+import threading
+import multiprocessing
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from typing import List, Dict, Iterator, Optional
+
+from fastapi import FastAPI, BackgroundTasks, HTTPException
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from apscheduler.schedulers.background import BackgroundScheduler
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+try:
+    import lxml.html as lxml_html
+    from lxml import etree as lxml_etree
+except ImportError:  # optional: the stdlib parser is used instead
+    lxml_html = lxml_etree = None
+
+try:
+    import zstandard
+except ImportError:  # optional: payload blobs fall back to zlib
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: /export.parquet and /export.arrow need it
+    pa = pq = None
+
 # -------------------------------------------------
 # Config
 # -------------------------------------------------
@@ -40,7 +80,8 @@ DB_PATH = os.environ.get("DB_PATH", "counts.db")
 #     * Map centered over The Villages
 # - new & preowned & status (for-sale only)
 # - hideHeader to reduce clutter
-HOMEFINDER_URL = (
+# (HOMEFINDER_URL env overrides it, e.g. to point at fixture_server.py)
+HOMEFINDER_URL = os.environ.get("HOMEFINDER_URL") or (
     "https://development.avengers.thevillages.com/homefinder/"
     f"?lat={VILLAGES_LAT}"
     f"&lng={VILLAGES_LNG}"
@@ -48,6 +89,179 @@ HOMEFINDER_URL = (
     f"&new&preowned&status&hideHeader"
 )
 
+# How card data is pulled out of the page on each harvest loop:
+# - "bulk":    one execute_script call returns the text of every rendered card
+# - "html":    one execute_script call returns the list HTML, parsed in Python
+#              (lxml when installed); replay re-parses recorded HTML this way
+# - "element": legacy path, one WebDriver round-trip per card (card.text)
+EXTRACT_MODE = os.environ.get("SCRAPE_EXTRACT_MODE", "bulk")
+
+# Scraping engine:
+# - "scroll":  scroll md-content and harvest the rendered cards
+# - "network": read the listing JSON the SPA fetches over XHR, straight
+#              from Chrome's performance log (no scrolling at all)
+SCRAPE_ENGINE = os.environ.get("SCRAPE_ENGINE", "scroll")
+
+# Optional substring of the listing feed URL; when empty, any JSON
+# response that contains listing-shaped records is used.
+FEED_URL_HINT = os.environ.get("HOMEFINDER_FEED_HINT", "")
+
+# Network engine: stop once no new feed responses arrive for this long.
+FEED_IDLE_SECONDS = float(os.environ.get("FEED_IDLE_SECONDS", "3"))
+FEED_TIMEOUT_SECONDS = float(os.environ.get("FEED_TIMEOUT_SECONDS", "60"))
+
+# Element holding Homefinder's result count; when empty the page text is
+# searched for "<n> Homes/Results/Listings". Only a count read through the
+# selector stops the scroll engine early.
+COUNT_SELECTOR = os.environ.get("HOMEFINDER_COUNT_SELECTOR", "")
+
+# Scroll engine pacing:
+# - "observer": scroll, then wait (up to RENDER_TIMEOUT_SECONDS) only until
+#               md-virtual-repeat actually re-renders; stop at the bottom
+# - "sleep":    legacy fixed sleeps and the 8-idle-loop exit
+HARVEST_MODE = os.environ.get("SCRAPE_HARVEST_MODE", "observer")
+RENDER_TIMEOUT_SECONDS = float(os.environ.get("RENDER_TIMEOUT_SECONDS", "3"))
+
+# Resource blocking profile for the Homefinder page load: images are
+# disabled via Chrome prefs and map tiles / fonts / analytics are blocked
+# with CDP Network.setBlockedURLs. Patterns use "*" wildcards and can be
+# replaced with a comma-separated BLOCKED_URL_PATTERNS. Any pattern that
+# would match HOMEFINDER_URL, HOMEFINDER_FEED_URL or an entry of
+# RESOURCE_ALLOWLIST (URLs or URL fragments) is dropped, so listing data
+# requests are never blocked.
+BLOCK_RESOURCES = os.environ.get("BLOCK_RESOURCES", "1") == "1"
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*maps.googleapis.com/maps/vt*",
+    "*maps.googleapis.com/maps/api/js/StaticMapService*",
+    "*maps.gstatic.com*",
+    "*tile.openstreetmap.org*",
+    "*tiles.mapbox.com*",
+    "*api.mapbox.com/*/tiles/*",
+    "*arcgisonline.com/*/tile/*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*connect.facebook.net*",
+    "*hotjar.com*",
+]
+BLOCKED_URL_PATTERNS = [
+    p.strip()
+    for p in os.environ.get("BLOCKED_URL_PATTERNS", ",".join(DEFAULT_BLOCKED_URL_PATTERNS)).split(",")
+    if p.strip()
+]
+RESOURCE_ALLOWLIST = [
+    p.strip() for p in os.environ.get("RESOURCE_ALLOWLIST", "").split(",") if p.strip()
+]
+
+# Warm Chrome pool for the long-lived API process (0 = launch per run).
+# Drivers are recycled after DRIVER_MAX_USES runs or once the
+# chromedriver + Chrome process tree exceeds DRIVER_MAX_RSS_MB.
+DRIVER_POOL_SIZE = int(os.environ.get("DRIVER_POOL_SIZE", "1"))
+DRIVER_MAX_USES = int(os.environ.get("DRIVER_MAX_USES", "20"))
+DRIVER_MAX_RSS_MB = int(os.environ.get("DRIVER_MAX_RSS_MB", "700"))
+
+# Sharded scraping (Chrome backend): split a run into independent slices
+# scraped concurrently in a process pool, then merged and de-duplicated.
+# - "":       single pass over HOMEFINDER_URL (default)
+# - "type":   new and preowned listings as two slices
+# - "grid:N": N x N lat/lng sub-boxes covering SHARD_SPAN_LAT x SHARD_SPAN_LNG
+#             around VILLAGES_LAT/VILLAGES_LNG, loaded at zoom SHARD_GRID_LVL
+SCRAPE_SHARDS = os.environ.get("SCRAPE_SHARDS", "")
+
+# Set (by _iter_sharded) in the environment shard worker processes are
+# spawned with: they import this module only to run _scrape_shard(), so
+# they skip init_db() and the scheduler. multiprocessing.parent_process()
+# can't tell them apart from e.g. the server process under `uvicorn --reload`.
+SHARD_WORKER_ENV = "VILLAGES_SHARD_WORKER"
+IS_SHARD_WORKER = os.environ.get(SHARD_WORKER_ENV) == "1"
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", str(os.cpu_count() or 1)))
+SHARD_SPAN_LAT = float(os.environ.get("SHARD_SPAN_LAT", "0.26"))
+SHARD_SPAN_LNG = float(os.environ.get("SHARD_SPAN_LNG", "0.18"))
+SHARD_GRID_LVL = os.environ.get("SHARD_GRID_LVL", "3")
+
+# run_count writes listings to SQLite in batches of this size while the
+# scrape is still running
+RUN_BATCH_SIZE = int(os.environ.get("RUN_BATCH_SIZE", "50"))
+
+# Checkpoints: partial batches are also flushed every
+# CHECKPOINT_INTERVAL_SECONDS, and run_count(resume=True) picks up an
+# unfinished run whose last checkpoint is newer than RESUME_MAX_AGE_MINUTES.
+CHECKPOINT_INTERVAL_SECONDS = float(os.environ.get("CHECKPOINT_INTERVAL_SECONDS", "15"))
+RESUME_MAX_AGE_MINUTES = float(os.environ.get("RESUME_MAX_AGE_MINUTES", "180"))
+
+# Scraper backend:
+# - "selenium": headless Chrome running SCRAPE_ENGINE (default)
+# - "http":     no browser; page through HOMEFINDER_FEED_URL directly
+#               (the feed endpoint is logged by the network engine)
+# - "replay":   no network at all; re-parse the archive at SCRAPE_REPLAY_PATH
+SCRAPE_BACKEND = os.environ.get("SCRAPE_BACKEND", "selenium")
+
+# Record raw harvest data (card texts + md-content HTML per harvest loop,
+# or feed payloads) to a gzip'd JSON-lines archive. "{ts}" in the path is
+# replaced with the run's UTC timestamp.
+SCRAPE_RECORD_PATH = os.environ.get("SCRAPE_RECORD_PATH", "")
+SCRAPE_REPLAY_PATH = os.environ.get("SCRAPE_REPLAY_PATH", "")
+HOMEFINDER_FEED_URL = os.environ.get("HOMEFINDER_FEED_URL", "")
+# Leave FEED_PAGE_PARAM empty if the feed returns everything at once
+FEED_PAGE_PARAM = os.environ.get("FEED_PAGE_PARAM", "page")
+FEED_PAGE_SIZE_PARAM = os.environ.get("FEED_PAGE_SIZE_PARAM", "pageSize")
+FEED_PAGE_SIZE = int(os.environ.get("FEED_PAGE_SIZE", "100"))
+FEED_FIRST_PAGE = int(os.environ.get("FEED_FIRST_PAGE", "1"))
+
+# SQLite connections: one per thread, reused across requests (so their
+# prepared-statement caches are too), in WAL mode so readers aren't
+# blocked by run_count's writes
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "wal")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "normal")
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "10000"))
+
+# Rows per record batch (and Parquet row group) in the columnar exports
+EXPORT_BATCH_ROWS = int(os.environ.get("EXPORT_BATCH_ROWS", "65536"))
+
+# Runs that finished (legacy rows have no state and were always complete)
+COMPLETE_RUN = "(state IS NULL OR state = 'complete')"
+
+# Keep each completed run's full listing records as a compressed,
+# column-oriented blob in daily_counts.payload (off by default; counts and
+# listing_spans don't need it)
+STORE_RUN_PAYLOADS = os.environ.get("STORE_RUN_PAYLOADS", "0") == "1"
+
+# Listings per transaction when init_db() moves old payload_json runs into
+# listing_snapshots
+BACKFILL_BATCH_SIZE = int(os.environ.get("BACKFILL_BATCH_SIZE", "5000"))
+
+# Compaction (compact_history, daily after the scrape): runs older than
+# RETAIN_DETAIL_DAYS are folded into weekly and monthly rollups and then
+# deleted; weekly rollups older than ROLLUP_WEEKLY_DAYS are dropped, leaving
+# the monthly ones. If COMPACT_ARCHIVE_DIR is set, the deleted runs' payload
+# blobs are written there first.
+RETAIN_DETAIL_DAYS = int(os.environ.get("RETAIN_DETAIL_DAYS", "90"))
+ROLLUP_WEEKLY_DAYS = int(os.environ.get("ROLLUP_WEEKLY_DAYS", "730"))
+COMPACT_ARCHIVE_DIR = os.environ.get("COMPACT_ARCHIVE_DIR", "")
+
+# Optional region boundaries: a GeoJSON FeatureCollection of Polygon /
+# MultiPolygon features whose REGION_BOUNDARIES_PROPERTY names the region.
+# Listings with coordinates are classified by point-in-polygon against it
+# (first matching feature wins), through a REGION_GRID_SIZE x
+# REGION_GRID_SIZE cell index; everything else falls back to village names.
+# No boundary file ships with the repo.
+REGION_BOUNDARIES_PATH = os.environ.get("REGION_BOUNDARIES_PATH", "")
+REGION_BOUNDARIES_PROPERTY = os.environ.get("REGION_BOUNDARIES_PROPERTY", "region")
+REGION_GRID_SIZE = int(os.environ.get("REGION_GRID_SIZE", "256"))
+
 app = FastAPI(title="Villages Listing Tracker")
 
 # CORS so frontend on another domain can call this API
@@ -79,7 +293,6 @@ REGION_DEFS = {
         "Chula Vista",
         "El Cortez",
         "El Santiago",
-        "El Cortez",
     ],
     "Between 466 & 466A": [
         "Belvedere",
@@ -102,7 +315,6 @@ REGION_DEFS = {
         "St. James",
         "Tamarind Grove",
         "Buttonwood",
-        "St. James",
         "Sanibel",
         "Hillsborough",
         "Collier",
@@ -134,14 +346,46 @@ REGION_DEFS = {
 }
 
 
+def _normalize_village(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _build_region_index():
+    """
+    Exact-name table plus one substring matcher over every village name.
+
+    The alternation is ordered longest name first, so where names nest
+    ("Lake Denham East" / "Lake Denham") the longer one wins regardless of
+    REGION_DEFS order. A name listed under two regions keeps the first.
+    """
+    exact = {}
+    for region, villages in REGION_DEFS.items():
+        for name in villages:
+            key = _normalize_village(name)
+            for form in (key, f"village of {key}", f"the village of {key}"):
+                exact.setdefault(form, region)
+    names = sorted(
+        {k for k in exact if not k.startswith(("village of ", "the village of "))},
+        key=lambda k: (-len(k), k),
+    )
+    matcher = re.compile("|".join(re.escape(k) for k in names))
+    return exact, matcher
+
+
+_REGION_BY_NAME, _VILLAGE_NAME_RE = _build_region_index()
+
+
+@lru_cache(maxsize=4096)
 def classify_region(village: str) -> str:
     if not village:
         return "Unknown"
-    v = village.strip().lower()
-    for region, villages in REGION_DEFS.items():
-        for name in villages:
-            if name.lower() in v:
-                return region
+    v = _normalize_village(village)
+    region = _REGION_BY_NAME.get(v)
+    if region:
+        return region
+    m = _VILLAGE_NAME_RE.search(v)
+    if m:
+        return _REGION_BY_NAME[m.group(0)]
     # simple keyword fallbacks
     if "denham" in v:
         return "South of 44"
@@ -150,13 +394,409 @@ def classify_region(village: str) -> str:
     return "Unknown"
 
 
+def _odd_crossings(x: float, y: float, edges) -> bool:
+    """Even-odd ray cast to the right of (x, y) over (xa, ya, xb, yb) edges."""
+    inside = False
+    for xa, ya, xb, yb in edges:
+        if (ya > y) != (yb > y) and x < (xb - xa) * (y - ya) / (yb - ya) + xa:
+            inside = not inside
+    return inside
+
+
+class RegionIndex:
+    """
+    Point-in-polygon region lookup over GeoJSON boundaries.
+
+    Polygons are bucketed into a uniform grid over their combined bounding
+    box. Cells no boundary edge crosses resolve straight to a region; points
+    in the other cells are ray-cast against just the edges spanning their
+    grid row. Cost does not depend on how many villages REGION_DEFS lists.
+    """
+
+    def __init__(self, features: List[Dict], grid_size: int = 256):
+        # (region, bbox, edges); edges cover the outer ring and any holes
+        self.polygons = []
+        for feature in features:
+            region = (feature.get("properties") or {}).get(REGION_BOUNDARIES_PROPERTY)
+            geometry = feature.get("geometry") or {}
+            if not region or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+                continue
+            parts = geometry["coordinates"]
+            if geometry["type"] == "Polygon":
+                parts = [parts]
+            for rings in parts:
+                xs = [pt[0] for pt in rings[0]]
+                ys = [pt[1] for pt in rings[0]]
+                edges = [
+                    (a[0], a[1], b[0], b[1])
+                    for ring in rings
+                    for a, b in zip(ring, ring[1:])
+                    if a[1] != b[1] or a[0] != b[0]
+                ]
+                self.polygons.append((region, (min(xs), min(ys), max(xs), max(ys)), edges))
+
+        self.grid_size = max(1, grid_size)
+        # cell -> [(region, None if the whole cell is inside, else the
+        # polygon's edges spanning that row)], in feature order
+        self.cells: Dict[tuple, List[tuple]] = {}
+        if not self.polygons:
+            return
+        self.min_x = min(p[1][0] for p in self.polygons)
+        self.min_y = min(p[1][1] for p in self.polygons)
+        self.max_x = max(p[1][2] for p in self.polygons)
+        self.max_y = max(p[1][3] for p in self.polygons)
+        self.cell_w = (self.max_x - self.min_x) / self.grid_size or 1.0
+        self.cell_h = (self.max_y - self.min_y) / self.grid_size or 1.0
+
+        for region, (x0, y0, x1, y1), edges in self.polygons:
+            # cells an edge passes through need the exact test; the rest of
+            # the bounding box is wholly inside or outside, decided per row
+            # from the cell centres
+            edge_cells = set()
+            row_edges: Dict[int, list] = {}
+            for edge in edges:
+                xa, ya, xb, yb = edge
+                c0, r0 = self._cell(min(xa, xb), min(ya, yb))
+                c1, r1 = self._cell(max(xa, xb), max(ya, yb))
+                for row in range(r0, r1 + 1):
+                    row_edges.setdefault(row, []).append(edge)
+                    for col in range(c0, c1 + 1):
+                        edge_cells.add((col, row))
+            c0, r0 = self._cell(x0, y0)
+            c1, r1 = self._cell(x1, y1)
+            for row in range(r0, r1 + 1):
+                yc = self.min_y + (row + 0.5) * self.cell_h
+                crossings = sorted(
+                    (xb - xa) * (yc - ya) / (yb - ya) + xa
+                    for xa, ya, xb, yb in row_edges.get(row, ())
+                    if (ya > yc) != (yb > yc)
+                )
+                for col in range(c0, c1 + 1):
+                    if (col, row) in edge_cells:
+                        self.cells.setdefault((col, row), []).append((region, row_edges[row]))
+                        continue
+                    xc = self.min_x + (col + 0.5) * self.cell_w
+                    if bisect.bisect_left(crossings, xc) % 2:
+                        self.cells.setdefault((col, row), []).append((region, None))
+
+    def _cell(self, x: float, y: float):
+        last = self.grid_size - 1
+        col = min(max(int((x - self.min_x) / self.cell_w), 0), last)
+        row = min(max(int((y - self.min_y) / self.cell_h), 0), last)
+        return col, row
+
+    def lookup(self, lat: float, lng: float) -> Optional[str]:
+        if not self.polygons:
+            return None
+        x, y = lng, lat  # GeoJSON order
+        if not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
+            return None
+        last = self.grid_size - 1
+        cell = (
+            min(int((x - self.min_x) / self.cell_w), last),
+            min(int((y - self.min_y) / self.cell_h), last),
+        )
+        for region, edges in self.cells.get(cell, ()):
+            if edges is None or _odd_crossings(x, y, edges):
+                return region
+        return None
+
+    @classmethod
+    def load(cls, path: str, grid_size: int = 256) -> "RegionIndex":
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        features = payload.get("features", []) if isinstance(payload, dict) else payload
+        return cls(features, grid_size)
+
+
+_region_index = None
+
+
+def get_region_index() -> Optional[RegionIndex]:
+    """RegionIndex for REGION_BOUNDARIES_PATH, built on first use (None if unset)."""
+    global _region_index
+    if _region_index is None and REGION_BOUNDARIES_PATH:
+        try:
+            _region_index = RegionIndex.load(REGION_BOUNDARIES_PATH, REGION_GRID_SIZE)
+            logger.info(
+                "Loaded %d region polygons from %s",
+                len(_region_index.polygons),
+                REGION_BOUNDARIES_PATH,
+            )
+        except Exception as e:
+            logger.error("ERROR loading region boundaries %s: %s", REGION_BOUNDARIES_PATH, e)
+            _region_index = RegionIndex([])
+    return _region_index
+
+
+def _coord(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_listing_region(village: str, lat=None, lng=None) -> str:
+    """Region by coordinates when boundaries are loaded, else by village name."""
+    if lat is not None and lng is not None:
+        index = get_region_index()
+        region = index.lookup(lat, lng) if index else None
+        if region:
+            return region
+    return classify_region(village)
+
+
+# -------------------------------------------------
+# Listing records
+# -------------------------------------------------
+
+
+class Listing:
+    """
+    One harvested listing.
+
+    Slotted rather than a dict, with status / type / village / region
+    interned so every listing in a village shares the same strings.
+    Parsers pass status and type already lowercased; from_dict() normalizes
+    anything else. to_row() / from_row() are the positional form used for
+    SQLite rows and for pickling between shard workers.
+    """
+
+    __slots__ = ("id", "title", "status", "type", "village", "region", "lat", "lng")
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        status: str,
+        type: str,
+        village: str,
+        region: str,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+    ):
+        self.id = id
+        self.title = title
+        self.status = sys.intern(status)
+        self.type = sys.intern(type)
+        self.village = sys.intern(village)
+        self.region = sys.intern(region)
+        self.lat = lat
+        self.lng = lng
+
+    def to_row(self) -> tuple:
+        return (
+            self.id,
+            self.title,
+            self.status,
+            self.type,
+            self.village,
+            self.region,
+            self.lat,
+            self.lng,
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "Listing":
+        return cls(*row)
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Listing":
+        """For listings stored as dicts (payload_json of older runs)."""
+        village = d.get("village") or ""
+        return cls(
+            d.get("id") or "",
+            d.get("title") or "",
+            (d.get("status") or "active").lower(),
+            (d.get("type") or "").lower(),
+            village,
+            d.get("region") or classify_region(village),
+            d.get("lat"),
+            d.get("lng"),
+        )
+
+    def as_dict(self) -> Dict:
+        return dict(zip(self.__slots__, self.to_row()))
+
+    def __reduce__(self):
+        return (Listing, self.to_row())
+
+    def __eq__(self, other):
+        return isinstance(other, Listing) and self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"Listing{self.to_row()!r}"
+
+
+# Payload blob format: version byte + header length, a JSON header, then
+# one separately compressed block per Listing field, so readers can decode
+# just the columns they need. Low-cardinality fields are dictionary-encoded
+# (values in the header, integer codes in the block); coordinates are packed
+# doubles (NaN = missing). Anything without a version byte is legacy JSON.
+PAYLOAD_ZLIB = 1
+PAYLOAD_ZSTD = 2
+_PAYLOAD_HEAD = struct.Struct("<BI")
+_PAYLOAD_KINDS = {
+    "id": "str",
+    "title": "str",
+    "status": "dict",
+    "type": "dict",
+    "village": "dict",
+    "region": "dict",
+    "lat": "float",
+    "lng": "float",
+}
+
+
+def _compress(version: int, data: bytes) -> bytes:
+    if version == PAYLOAD_ZSTD:
+        return zstandard.ZstdCompressor().compress(data)
+    return zlib.compress(data)
+
+
+def _decompress(version: int, data) -> bytes:
+    if version == PAYLOAD_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("payload is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_payload(listings: List[Listing]) -> bytes:
+    version = PAYLOAD_ZSTD if zstandard is not None else PAYLOAD_ZLIB
+    header = {"n": len(listings), "byteorder": sys.byteorder, "columns": {}}
+    blocks = []
+    offset = 0
+    for name, kind in _PAYLOAD_KINDS.items():
+        values = [getattr(listing, name) for listing in listings]
+        col = {"kind": kind}
+        if kind == "dict":
+            col["values"] = list(dict.fromkeys(values))
+            index = {v: i for i, v in enumerate(col["values"])}
+            col["typecode"] = "H" if len(index) <= 0xFFFF else "I"
+            raw = array(col["typecode"], [index[v] for v in values]).tobytes()
+        elif kind == "float":
+            raw = array("d", [float("nan") if v is None else v for v in values]).tobytes()
+        else:
+            raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        block = _compress(version, raw)
+        col["offset"], col["length"] = offset, len(block)
+        header["columns"][name] = col
+        blocks.append(block)
+        offset += len(block)
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return _PAYLOAD_HEAD.pack(version, len(head)) + head + b"".join(blocks)
+
+
+def decode_payload(blob, columns=None) -> Dict[str, list]:
+    """
+    Decode the given Listing columns (default: all) of a payload, as
+    {column: [value per listing]}. Other columns' blocks are not touched.
+    """
+    columns = columns or tuple(_PAYLOAD_KINDS)
+    if isinstance(blob, str) or bytes(blob[:1]) in (b"[", b"{"):
+        # legacy payload_json text
+        listings = [Listing.from_dict(d) for d in json.loads(blob)]
+        return {name: [getattr(listing, name) for listing in listings] for name in columns}
+
+    blob = memoryview(blob)
+    version, head_len = _PAYLOAD_HEAD.unpack_from(blob)
+    if version not in (PAYLOAD_ZLIB, PAYLOAD_ZSTD):
+        raise ValueError(f"Unknown payload version {version}")
+    start = _PAYLOAD_HEAD.size + head_len
+    header = json.loads(bytes(blob[_PAYLOAD_HEAD.size : start]))
+
+    out = {}
+    for name in columns:
+        col = header["columns"][name]
+        offset = start + col["offset"]
+        raw = _decompress(version, blob[offset : offset + col["length"]])
+        if col["kind"] == "dict":
+            codes = array(col["typecode"])
+            codes.frombytes(raw)
+            if header["byteorder"] != sys.byteorder:
+                codes.byteswap()
+            values = [sys.intern(v) for v in col["values"]]
+            out[name] = [values[i] for i in codes]
+        elif col["kind"] == "float":
+            floats = array("d")
+            floats.frombytes(raw)
+            if header["byteorder"] != sys.byteorder:
+                floats.byteswap()
+            out[name] = [None if v != v else v for v in floats]
+        else:
+            out[name] = json.loads(raw)
+    return out
+
+
+def iter_payload(blob) -> Iterator[Listing]:
+    """Every Listing of a payload (new blob or legacy JSON text)."""
+    cols = decode_payload(blob)
+    for row in zip(*(cols[name] for name in _PAYLOAD_KINDS)):
+        yield Listing.from_row(row)
+
+
 # -------------------------------------------------
 # DB helpers
 # -------------------------------------------------
 
 
+_db_local = threading.local()
+
+
+def _connect(path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    if path == ":memory:":
+        # one in-memory DB shared by every thread's connection
+        conn = sqlite3.connect(
+            "file:villages-memdb?mode=memory&cache=shared",
+            uri=True,
+            cached_statements=256,
+            check_same_thread=check_same_thread,
+        )
+    else:
+        conn = sqlite3.connect(
+            path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000.0,
+            cached_statements=256,
+            check_same_thread=check_same_thread,
+        )
+    conn.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    conn.execute(f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def get_db() -> sqlite3.Connection:
+    """
+    This thread's connection to DB_PATH, opened on first use and kept.
+
+    Callers commit (or roll back) their own writes and must not close it.
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and _db_local.path != DB_PATH:
+        conn.close()
+        conn = None
+    if conn is None:
+        conn = _connect(DB_PATH)
+        _db_local.conn, _db_local.path = conn, DB_PATH
+    return conn
+
+
+def open_stream_db() -> sqlite3.Connection:
+    """
+    A private connection for a streamed response. Starlette may run each
+    step of a streaming generator on a different worker thread, so this
+    one isn't tied to a thread; the generator must close it.
+    """
+    return _connect(DB_PATH, check_same_thread=False)
+
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db()
     c = conn.cursor()
     c.execute(
         """
@@ -169,11 +809,360 @@ def init_db():
         )
         """
     )
+    # columns added after the first release
+    existing = {r[1] for r in c.execute("PRAGMA table_info(daily_counts)")}
+    for name, decl in (
+        ("expected_total", "INTEGER"),
+        ("harvested_total", "INTEGER"),
+        # 'running' / 'complete' / 'failed'; NULL for runs stored before
+        # incremental writes, which were always complete
+        ("state", "TEXT"),
+        # encode_payload() blob of the run's listings (STORE_RUN_PAYLOADS)
+        ("payload", "BLOB"),
+        # run_at as UTC epoch seconds, for indexed date-range queries
+        ("run_at_epoch", "INTEGER"),
+    ):
+        if name not in existing:
+            c.execute(f"ALTER TABLE daily_counts ADD COLUMN {name} {decl}")
+    c.execute(
+        "UPDATE daily_counts SET run_at_epoch = CAST(strftime('%s', run_at) AS INTEGER) "
+        "WHERE run_at_epoch IS NULL AND run_at IS NOT NULL"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_daily_counts_complete_epoch "
+        f"ON daily_counts(run_at_epoch) WHERE {COMPLETE_RUN}"
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS listing_snapshots (
+            run_id INTEGER,
+            listing_id TEXT,
+            title TEXT,
+            status TEXT,
+            type TEXT,
+            village TEXT,
+            region TEXT
+        )
+        """
+    )
+    existing = {r[1] for r in c.execute("PRAGMA table_info(listing_snapshots)")}
+    for name in ("lat", "lng"):
+        if name not in existing:
+            c.execute(f"ALTER TABLE listing_snapshots ADD COLUMN {name} REAL")
+    # per-run grouping (checkpoints, aggregate backfill) is answered from
+    # this index alone; the second serves the listing_spans diff
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_listing_snapshots_group "
+        "ON listing_snapshots(run_id, region, village, status)"
+    )
+    c.execute("DROP INDEX IF EXISTS idx_listing_snapshots_run")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_listing_snapshots_listing "
+        "ON listing_snapshots(listing_id, run_id)"
+    )
+    # Resume point of an unfinished run. Seen IDs and harvested records
+    # are that run's listing_snapshots rows, written in the same
+    # transaction as the checkpoint.
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+            run_id INTEGER PRIMARY KEY,
+            updated_at TEXT,
+            scroll_top INTEGER
+        )
+        """
+    )
+    # Region / village counts of each completed run, written by run_count
+    # alongside the 'complete' state; /latest reads only this table
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_aggregates (
+            run_id INTEGER,
+            region TEXT,
+            village TEXT,
+            active INTEGER,
+            pending INTEGER,
+            total INTEGER,
+            PRIMARY KEY (run_id, region, village)
+        ) WITHOUT ROWID
+        """
+    )
+    # Change-based listing history: one row per stretch of completed runs
+    # over which a listing kept the same status / type / village / region,
+    # valid for runs valid_from_run <= id < valid_to_run (NULL = still
+    # listed). A run's listing_snapshots rows are folded in here when it
+    # completes and then deleted.
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS listing_spans (
+            listing_id TEXT,
+            status TEXT,
+            type TEXT,
+            village TEXT,
+            region TEXT,
+            valid_from_run INTEGER,
+            valid_to_run INTEGER
+        )
+        """
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_listing_spans_open "
+        "ON listing_spans(listing_id) WHERE valid_to_run IS NULL"
+    )
+    # Point-in-time reads go through the open index plus this one (spans
+    # closed after the run); a (valid_from_run, valid_to_run) index can't
+    # bound valid_from_run <= run, so it is replaced
+    c.execute("DROP INDEX IF EXISTS idx_listing_spans_valid")
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_listing_spans_closed "
+        "ON listing_spans(valid_to_run) WHERE valid_to_run IS NOT NULL"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_listing_spans_listing "
+        "ON listing_spans(listing_id, valid_from_run)"
+    )
+    # Compacted history: sums over the completed runs of each week / month
+    # (period_start is the UTC epoch of its Monday / 1st)
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_counts (
+            period TEXT,
+            period_start INTEGER,
+            runs INTEGER,
+            active_sum INTEGER,
+            pending_sum INTEGER,
+            harvested_sum INTEGER,
+            last_run_at TEXT,
+            PRIMARY KEY (period, period_start)
+        ) WITHOUT ROWID
+        """
+    )
+    c.execute(
+        """
+        CREATE TABLE IF NOT EXISTS rollup_aggregates (
+            period TEXT,
+            period_start INTEGER,
+            region TEXT,
+            village TEXT,
+            active_sum INTEGER,
+            pending_sum INTEGER,
+            total_sum INTEGER,
+            PRIMARY KEY (period, period_start, region, village)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.commit()
+    backfill_payload_json(conn)
+    backfill_run_aggregates(conn)
+    backfill_listing_spans(conn)
+
+
+def backfill_payload_json(conn, batch_size: int = BACKFILL_BATCH_SIZE):
+    """
+    Move listings out of daily_counts.payload_json (runs stored before
+    listing_snapshots existed) into listing_snapshots.
+
+    One run at a time, committing every batch_size listings; payload_json
+    is cleared in the same transaction as the run's last batch, so an
+    interrupted backfill restarts that run from scratch next time. The
+    records are kept, re-encoded, in payload whatever STORE_RUN_PAYLOADS
+    says: listing_spans has no titles or coordinates, so once the
+    snapshots are folded the payload is the only copy.
+    """
+    c = conn.cursor()
+    run_ids = [
+        r[0] for r in c.execute("SELECT id FROM daily_counts WHERE payload_json IS NOT NULL")
+    ]
+    for run_id in run_ids:
+        c.execute("SELECT payload_json FROM daily_counts WHERE id = ?", (run_id,))
+        listings = list(iter_payload(c.fetchone()[0] or "[]"))
+        c.execute("DELETE FROM listing_snapshots WHERE run_id = ?", (run_id,))
+        for start in range(0, len(listings), batch_size):
+            c.executemany(
+                "INSERT INTO listing_snapshots("
+                "run_id, listing_id, title, status, type, village, region, lat, lng) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id,) + r.to_row() for r in listings[start : start + batch_size]],
+            )
+            if start + batch_size < len(listings):
+                conn.commit()
+        c.execute(
+            "UPDATE daily_counts SET payload_json = NULL, payload = ?, "
+            "harvested_total = COALESCE(harvested_total, ?) WHERE id = ?",
+            (encode_payload(listings), len(listings), run_id),
+        )
+        conn.commit()
+    if run_ids:
+        logger.info("Backfilled %d runs from payload_json into listing_snapshots.", len(run_ids))
+
+
+def backfill_run_aggregates(conn):
+    """Aggregate completed runs that have snapshots but no run_aggregates rows."""
+    c = conn.cursor()
+    c.execute(
+        f"""
+        INSERT INTO run_aggregates(run_id, region, village, active, pending, total)
+        SELECT run_id, region, COALESCE(NULLIF(village, ''), 'Unknown'),
+               SUM(status = 'active'), SUM(status = 'pending'), COUNT(*)
+        FROM listing_snapshots
+        WHERE run_id IN (
+            SELECT id FROM daily_counts
+            WHERE {COMPLETE_RUN}
+              AND NOT EXISTS (SELECT 1 FROM run_aggregates WHERE run_id = daily_counts.id)
+        )
+        GROUP BY run_id, region, COALESCE(NULLIF(village, ''), 'Unknown')
+        """
+    )
+    if c.rowcount > 0:
+        logger.info("Backfilled %d run_aggregates rows.", c.rowcount)
+
+    # runs whose listings survive only in a payload blob
+    c.execute(
+        f"SELECT id, payload FROM daily_counts WHERE {COMPLETE_RUN} AND payload IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM run_aggregates WHERE run_id = daily_counts.id)"
+    )
+    for run_id, payload in c.fetchall():
+        cols = decode_payload(payload, ("status", "village", "region"))
+        grouped: Dict[str, Dict[str, Dict[str, int]]] = {}
+        for status, village, region in zip(cols["status"], cols["village"], cols["region"]):
+            add_counts(grouped, region, village, status)
+        write_run_aggregates(c, run_id, grouped)
     conn.commit()
-    conn.close()
 
 
-init_db()
+def apply_run_to_spans(c, run_id: int):
+    """
+    Fold a completed run's listing_snapshots into listing_spans.
+
+    Set difference against the open spans: spans whose listing is missing
+    from this run, or present with a different state, are closed at
+    run_id; listings left without an open span get a new one. Unchanged
+    listings are not touched. The run's snapshot rows, and those of
+    earlier failed runs, are then dropped.
+
+    Spans only move forward: a run older than one already folded (a
+    complete run with no snapshot rows left) is not folded.
+    """
+    c.execute(
+        f"SELECT MAX(id) FROM daily_counts WHERE {COMPLETE_RUN} AND id > ? "
+        "AND NOT EXISTS (SELECT 1 FROM listing_snapshots WHERE run_id = daily_counts.id)",
+        (run_id,),
+    )
+    newer = c.fetchone()[0]
+    if newer is not None:
+        logger.warning(
+            "Run %d finished after run %d; its listings are not folded into listing_spans.",
+            run_id,
+            newer,
+        )
+        c.execute("DELETE FROM listing_snapshots WHERE run_id = ?", (run_id,))
+        return
+    c.execute(
+        """
+        UPDATE listing_spans SET valid_to_run = ?
+        WHERE valid_to_run IS NULL
+          AND NOT EXISTS (
+            SELECT 1 FROM listing_snapshots s
+            WHERE s.run_id = ?
+              AND s.listing_id = listing_spans.listing_id
+              AND s.status IS listing_spans.status
+              AND s.type IS listing_spans.type
+              AND s.village IS listing_spans.village
+              AND s.region IS listing_spans.region
+          )
+        """,
+        (run_id, run_id),
+    )
+    closed = c.rowcount
+    c.execute(
+        """
+        INSERT INTO listing_spans(listing_id, status, type, village, region, valid_from_run)
+        SELECT s.listing_id, s.status, s.type, s.village, s.region, s.run_id
+        FROM listing_snapshots s
+        WHERE s.run_id = ?
+          AND NOT EXISTS (
+            SELECT 1 FROM listing_spans p
+            WHERE p.listing_id = s.listing_id AND p.valid_to_run IS NULL
+          )
+        """,
+        (run_id,),
+    )
+    opened = c.rowcount
+    c.execute(
+        "DELETE FROM listing_snapshots WHERE run_id = ? OR run_id IN "
+        "(SELECT id FROM daily_counts WHERE state = 'failed' AND id < ?)",
+        (run_id, run_id),
+    )
+    logger.info("Run %d: closed %d listing spans, opened %d.", run_id, closed, opened)
+
+
+def backfill_listing_spans(conn):
+    """
+    Fold completed runs still holding listing_snapshots rows, oldest
+    first. A run without a payload gets one from its snapshots first, so
+    folding doesn't lose its titles and coordinates.
+    """
+    c = conn.cursor()
+    runs = c.execute(
+        f"SELECT id, payload IS NULL FROM daily_counts WHERE {COMPLETE_RUN} "
+        "AND EXISTS (SELECT 1 FROM listing_snapshots WHERE run_id = daily_counts.id) "
+        "ORDER BY id"
+    ).fetchall()
+    for run_id, needs_payload in runs:
+        if needs_payload:
+            store_run_payload(c, run_id)
+        apply_run_to_spans(c, run_id)
+        conn.commit()
+
+
+def store_run_payload(c, run_id: int):
+    """Encode a run's listing_snapshots rows into daily_counts.payload."""
+    c.execute(
+        "SELECT listing_id, title, status, type, village, region, lat, lng "
+        "FROM listing_snapshots WHERE run_id = ? ORDER BY rowid",
+        (run_id,),
+    )
+    payload = encode_payload([Listing.from_row(r) for r in c.fetchall()])
+    c.execute("UPDATE daily_counts SET payload = ? WHERE id = ?", (payload, run_id))
+
+
+def listings_at_run(c, run_id: int):
+    """
+    Point-in-time listings of a completed run from listing_spans, as
+    (listing_id, status, type, village, region) rows. Reads the open spans
+    plus those closed after the run (two index ranges merged by listing_id),
+    so older runs cost more, up to every span kept since compaction.
+    """
+    return c.execute(
+        """
+        SELECT listing_id, status, type, village, region
+        FROM listing_spans INDEXED BY idx_listing_spans_open
+        WHERE valid_to_run IS NULL AND valid_from_run <= ?1
+        UNION ALL
+        SELECT listing_id, status, type, village, region
+        FROM listing_spans INDEXED BY idx_listing_spans_closed
+        WHERE valid_to_run > ?1 AND valid_from_run <= ?1
+        ORDER BY listing_id
+        """,
+        (run_id,),
+    )
+
+
+def write_run_aggregates(c, run_id: int, grouped: Dict[str, Dict[str, Dict[str, int]]]):
+    c.execute("DELETE FROM run_aggregates WHERE run_id = ?", (run_id,))
+    c.executemany(
+        "INSERT INTO run_aggregates(run_id, region, village, active, pending, total) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (run_id, region, village, counts["active"], counts["pending"], counts["total"])
+            for region, villages in grouped.items()
+            for village, counts in villages.items()
+        ],
+    )
+
+
+if not IS_SHARD_WORKER:
+    init_db()
 
 # -------------------------------------------------
 # Selenium helpers & scraping
@@ -187,10 +1176,367 @@ def make_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
+    # Performance log carries the CDP Network.* events the network engine
+    # and the transfer stats read back
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if BLOCK_RESOURCES:
+        chrome_options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
     driver = webdriver.Chrome(options=chrome_options)
+    if BLOCK_RESOURCES:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
     return driver
 
 
+def _wildcard_match(pattern: str, url: str) -> bool:
+    regex = ".*".join(re.escape(part) for part in pattern.split("*"))
+    return re.fullmatch(regex, url) is not None
+
+
+def blocked_url_patterns() -> List[str]:
+    """BLOCKED_URL_PATTERNS minus anything that would hit an allowlisted URL."""
+    keep = [u for u in (HOMEFINDER_URL, HOMEFINDER_FEED_URL) if u] + RESOURCE_ALLOWLIST
+    patterns = []
+    for pattern in BLOCKED_URL_PATTERNS:
+        if any(_wildcard_match(pattern, url) for url in keep):
+            logger.info("Not blocking %s: it matches an allowlisted URL.", pattern)
+            continue
+        patterns.append(pattern)
+    return patterns
+
+
+def read_performance_log(driver):
+    """Yield the CDP messages buffered in Chrome's performance log."""
+    for entry in driver.get_log("performance"):
+        try:
+            yield json.loads(entry["message"])["message"]
+        except Exception:
+            continue
+
+
+class NetworkTally:
+    """Running transfer totals built from CDP Network.* events."""
+
+    def __init__(self):
+        self.bytes = 0
+        self.requests = 0
+        self.blocked = 0
+        self._urls: Dict[str, str] = {}
+
+    def feed(self, message: Dict):
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            self._urls[params.get("requestId")] = params.get("request", {}).get("url", "")
+        elif method == "Network.loadingFinished":
+            self.bytes += int(params.get("encodedDataLength") or 0)
+            self.requests += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            self.blocked += 1
+            url = self._urls.get(params.get("requestId"), "")
+            if any(fragment in url for fragment in RESOURCE_ALLOWLIST):
+                logger.warning("Allowlisted request was blocked: %s", url)
+
+    def drain(self, driver):
+        for message in read_performance_log(driver):
+            self.feed(message)
+
+
+# -------------------------------------------------
+# Warm driver pool
+# -------------------------------------------------
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    """ppid -> [pid] for every process visible in /proc (Linux only)."""
+    children: Dict[int, List[int]] = {}
+    if not os.path.isdir("/proc"):
+        return children
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm may contain spaces; ppid is the 2nd field after ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_tree(pid: int, children: Dict[int, List[int]]) -> List[int]:
+    tree = [pid]
+    for child in children.get(pid, []):
+        tree.extend(_proc_tree(child, children))
+    return tree
+
+
+def _proc_name(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _rss_mb(pids: List[int]) -> float:
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024.0
+
+
+def _driver_pid(driver) -> Optional[int]:
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+class DriverPool:
+    """
+    Small pool of pre-launched headless Chrome drivers.
+
+    Used by scrape_listings() via `with driver_pool.driver() as driver:`.
+    Idle drivers are health-checked before use, recycled after
+    DRIVER_MAX_USES runs or when their process tree grows past
+    DRIVER_MAX_RSS_MB, and replaced in the background so the next run
+    starts warm. Until start() is called (or with size 0) every run gets
+    a fresh driver that is quit afterwards – the old behavior, and what
+    run_once.py uses.
+    """
+
+    def __init__(self, size: int, max_uses: int, max_rss_mb: int):
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self._idle: "queue.Queue" = queue.Queue()
+        self._uses: Dict[int, int] = {}
+        self._launching = 0  # make_driver() calls not yet in _uses
+        self._lock = threading.Lock()
+        self.active = False
+
+    # -- lifecycle -------------------------------------------------
+
+    def start(self):
+        """Reap leftovers from earlier processes and warm the pool."""
+        if self.size <= 0:
+            return
+        self.active = True
+        cleanup_orphaned_chromedrivers(self._tracked_pids())
+        for _ in range(self.size):
+            self._replenish_async()
+
+    def close(self):
+        self.active = False
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver)
+
+    # -- checkout --------------------------------------------------
+
+    @contextmanager
+    def driver(self):
+        driver = None
+        if self.active:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = None
+            if driver is not None and not self._healthy(driver):
+                logger.warning("Pooled WebDriver failed health check – replacing it.")
+                self._retire(driver)
+                driver = None
+
+        if driver is None:
+            logger.info("Launching Selenium WebDriver...")
+            driver = self._launch()
+        else:
+            logger.info("Using warm WebDriver from pool.")
+
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+
+    # -- internals -------------------------------------------------
+
+    def _launch(self, counted: bool = False):
+        """
+        make_driver(), counted in _launching until the driver is in _uses
+        so cleanup_orphaned_chromedrivers() treats it as busy. counted=True
+        when the caller already did the count before spawning a thread.
+        """
+        if not counted:
+            with self._lock:
+                self._launching += 1
+        driver = None
+        try:
+            driver = make_driver()
+        finally:
+            with self._lock:
+                self._launching -= 1
+                if driver is not None:
+                    self._uses[id(driver)] = 0
+        return driver
+
+    def _tracked_pids(self) -> List[int]:
+        pids = []
+        for driver in list(self._idle.queue):
+            pid = _driver_pid(driver)
+            if pid:
+                pids.append(pid)
+        return pids
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _retire(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _replenish_async(self):
+        with self._lock:
+            self._launching += 1
+
+        def launch():
+            try:
+                driver = self._launch(counted=True)
+            except Exception as e:
+                logger.error(f"Could not pre-launch WebDriver: {e}")
+                return
+            if not self.active:
+                self._retire(driver)
+            else:
+                self._idle.put(driver)
+
+        threading.Thread(target=launch, name="driver-pool-warm", daemon=True).start()
+
+    def _release(self, driver):
+        with self._lock:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+
+        if not self.active:
+            self._retire(driver)
+            return
+
+        reason = ""
+        if uses >= self.max_uses:
+            reason = f"{uses} uses"
+        else:
+            pid = _driver_pid(driver)
+            if pid:
+                rss = _rss_mb(_proc_tree(pid, _proc_children()))
+                if rss > self.max_rss_mb:
+                    reason = f"{rss:.0f} MB RSS"
+
+        if not reason and self._idle.qsize() >= self.size:
+            reason = "pool already full"
+
+        if not reason:
+            try:
+                # leave the browser idle and drop logs buffered by this run
+                driver.get("about:blank")
+                driver.get_log("performance")
+            except Exception:
+                reason = "reset failed"
+
+        if reason:
+            logger.info("Recycling WebDriver (%s).", reason)
+            self._retire(driver)
+            if self._idle.qsize() < self.size:
+                self._replenish_async()
+            cleanup_orphaned_chromedrivers(self._tracked_pids())
+        else:
+            self._idle.put(driver)
+
+
+def cleanup_orphaned_chromedrivers(keep_pids: List[int]) -> int:
+    """
+    Kill chromedriver process trees left behind by crashed runs.
+
+    A chromedriver is orphaned if it was re-parented to init, or is a
+    child of this process that no pooled driver owns. `keep_pids` are the
+    idle pooled drivers; our own children are left alone while any other
+    driver is checked out or still launching, since we can't tell those
+    apart from leftovers. Returns the number of trees killed.
+    """
+    children = _proc_children()
+    if not children:
+        return 0
+    keep = set(keep_pids)
+    with driver_pool._lock:
+        busy = len(driver_pool._uses) + driver_pool._launching - len(keep)
+    killed = 0
+    me = os.getpid()
+    for ppid, pids in children.items():
+        if ppid not in (1, me):
+            continue
+        for pid in pids:
+            if pid in keep or _proc_name(pid) != "chromedriver":
+                continue
+            if ppid == me and busy > 0:
+                # may belong to a driver that is checked out right now
+                continue
+            for tree_pid in reversed(_proc_tree(pid, children)):
+                try:
+                    os.kill(tree_pid, signal.SIGKILL)
+                except OSError:
+                    pass
+            killed += 1
+    if killed:
+        logger.warning("Killed %d orphaned chromedriver process tree(s).", killed)
+    return killed
+
+
+driver_pool = DriverPool(DRIVER_POOL_SIZE, DRIVER_MAX_USES, DRIVER_MAX_RSS_MB)
+
+
+# Card-text matching works on the lowercased text. Literal str.find / `in`
+# checks beat regex alternation in CPython for cards this short; the one
+# precompiled pattern strips separators out of the ID tail.
+_NON_ALNUM_RE = re.compile(r"[\W_]+")
+_TYPE_BY_PREFIX = {"vnh": "new", "vls": "preowned"}
+
+
+def _fold(text: str) -> str:
+    """Lowercase text without changing its length, so offsets line up."""
+    folded = text.lower()
+    if len(folded) != len(text):  # e.g. "İ" lowercases to two code points
+        folded = "".join(ch if len(ch.lower()) != 1 else ch.lower() for ch in text)
+    return folded
+
+
+def _id_from_tail(prefix: str, tail: str) -> Dict:
+    # Remove non-alphanumeric from the remainder
+    tail = tail.strip()
+    if not tail.isalnum():
+        tail = _NON_ALNUM_RE.sub("", tail)
+    tail = tail.upper()
+    norm_id = f"{prefix.upper()}{tail}" if tail else ""
+    return {"id": norm_id, "prefix": prefix.upper(), "type": _TYPE_BY_PREFIX[prefix]}
+
+
 def normalize_id_line(line: str) -> Dict:
     """
     Given a line like:
@@ -202,54 +1548,51 @@ def normalize_id_line(line: str) -> Dict:
       VNH# 240V045 -> VNH240V045
       VLS# 123-456 -> VLS123456
     """
-    text = line.strip().upper()
-
-    if text.startswith("VNH#"):
-        prefix = "VNH"
-        tail = text[4:]
-    elif text.startswith("VLS#"):
-        prefix = "VLS"
-        tail = text[4:]
-    else:
+    text = line.strip()
+    prefix = _fold(text[:4])
+    if prefix[3:] != "#" or prefix[:3] not in _TYPE_BY_PREFIX:
         return {"id": "", "prefix": "", "type": ""}
+    return _id_from_tail(prefix[:3], text[4:])
 
-    # Remove non-alphanumeric from the remainder
-    tail = "".join(ch for ch in tail if ch.isalnum())
-    norm_id = f"{prefix}{tail}" if tail else ""
-
-    home_type = "new" if prefix == "VNH" else "preowned"
 
-    return {"id": norm_id, "prefix": prefix, "type": home_type}
+def _line_bounds(text: str, pos: int):
+    start = text.rfind("\n", 0, pos) + 1
+    end = text.find("\n", pos)
+    return start, (len(text) if end < 0 else end)
 
 
-def parse_card(card) -> Dict:
+def parse_card_text(full_text: str, attrs: Optional[Dict] = None) -> Listing:
     """
-    Extract structured info from a propertyCard element.
+    Extract structured info from the visible text of a propertyCard.
 
     Changes vs your original:
     - Supports both VNH# and VLS# codes.
     - Normalizes to VNH240V045 / VLS123456 style IDs.
     - Uses VNH → 'new', VLS → 'preowned' mapping as primary
       and falls back to text-based detection.
+    - Lowercases the text once and finds each field by offset into it,
+      instead of re-splitting and re-lowercasing the card per field.
+    - Takes lat/lng from the card's data-* attributes when present.
     """
-    full_text = card.text or ""
-    lower = full_text.lower()
+    full_text = full_text or ""
+    folded = _fold(full_text)
 
     # -------------------------------------------------
-    # ID: VNH# or VLS#
+    # ID: first line starting with VNH# / VLS#
     # -------------------------------------------------
     uid = ""
     list_type = ""  # we'll set to "new" or "preowned"
 
-    for line in full_text.splitlines():
-        stripped = line.strip()
-        upper_line = stripped.upper()
-        if upper_line.startswith("VNH#") or upper_line.startswith("VLS#"):
-            id_info = normalize_id_line(upper_line)
+    pos = folded.find("#")
+    while pos >= 0:
+        prefix = folded[max(pos - 3, 0) : pos]
+        start, end = _line_bounds(folded, pos)
+        if prefix in _TYPE_BY_PREFIX and not full_text[start : pos - 3].strip():
+            id_info = _id_from_tail(prefix, full_text[pos + 1 : end])
             uid = id_info["id"]
-            if id_info["type"]:
-                list_type = id_info["type"]
+            list_type = id_info["type"]
             break
+        pos = folded.find("#", end)
 
     # If we couldn't find VNH/VLS, fall back to a generic id from text
     if not uid:
@@ -259,46 +1602,474 @@ def parse_card(card) -> Dict:
     # Village (line that contains "The Village of")
     # -------------------------------------------------
     village = ""
-    for line in full_text.splitlines():
-        if "village of" in line.lower():
-            village = line.strip()
-            break
+    pos = folded.find("village of")
+    if pos >= 0:
+        start, end = _line_bounds(folded, pos)
+        village = full_text[start:end].strip()
 
     # -------------------------------------------------
     # Status: default active, look for "pending" / "under contract"
     # -------------------------------------------------
     status = "active"
-    if "pending" in lower or "under contract" in lower:
+    if "pending" in folded or "under contract" in folded:
         status = "pending"
 
     # -------------------------------------------------
-    # Type: new vs preowned
-    #   - Prefer VNH/VLS mapping
-    #   - Fall back to text check
+    # Type: prefer VNH/VLS mapping, fall back to text check
     # -------------------------------------------------
     if not list_type:
         list_type = "preowned"
-        if "new home" in lower or "model" in lower:
+        if "new home" in folded or "model" in folded:
             list_type = "new"
 
-    region = classify_region(village)
-
-    return {
-        "id": uid,
-        "title": full_text[:120],
-        "status": status,
-        "type": list_type,
-        "village": village,
-        "region": region,
-    }
+    attrs = attrs or {}
+    lat = _coord(attrs.get("lat", attrs.get("latitude")))
+    lng = _coord(attrs.get("lng", attrs.get("longitude")))
+
+    return Listing(
+        uid,
+        full_text[:120],
+        status,
+        list_type,
+        village,
+        classify_listing_region(village, lat, lng),
+        lat,
+        lng,
+    )
 
 
-def scrape_listings() -> List[Dict]:
+def parse_card(card) -> Listing:
     """
-    Core scraping logic.
+    Extract structured info from a propertyCard WebElement.
 
-    Updated logic:
-    - Loads Homefinder with lat/lng/lvl=1 so map is:
+    Costs one WebDriver round-trip (card.text); prefer harvest_cards()
+    + parse_card_text() when handling many cards at once.
+    """
+    return parse_card_text(card.text or "")
+
+
+# Returns [{text, attrs}] for every rendered card in a single round-trip.
+# innerText matches what WebElement.text reports for visible elements.
+CARD_EXTRACT_JS = """
+var cards = document.querySelectorAll('md-card.propertyCard');
+var out = [];
+for (var i = 0; i < cards.length; i++) {
+  var el = cards[i];
+  var attrs = {};
+  for (var j = 0; j < el.attributes.length; j++) {
+    var a = el.attributes[j];
+    if (a.name.indexOf('data-') === 0) {
+      attrs[a.name.slice(5)] = a.value;
+    }
+  }
+  out.push({text: el.innerText || '', attrs: attrs});
+}
+return out;
+"""
+
+# Returns the outerHTML of the list container in a single round-trip.
+LIST_HTML_JS = """
+var el = document.querySelector('md-content') || document.documentElement;
+return el.outerHTML;
+"""
+
+
+# Elements that start a new line in innerText. Angular Material's
+# md-card-* parts are display:block too.
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tbody", "td", "th", "thead",
+    "tr", "ul", "md-card", "md-card-actions", "md-card-content",
+    "md-card-footer", "md-card-header", "md-card-title", "md-card-title-text",
+}
+SKIP_TAGS = {"script", "style", "template", "noscript"}
+# No end tag, so they never close a skipped subtree
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr",
+}
+
+
+def _is_property_card(tag: str, classes: str) -> bool:
+    return tag == "md-card" and "propertyCard" in (classes or "").split()
+
+
+def _is_hidden(tag: str, classes: Optional[str]) -> bool:
+    """Left out of innerText: non-rendered tags and Angular's ng-hide (display: none)."""
+    return tag in SKIP_TAGS or "ng-hide" in (classes or "").split()
+
+
+class _TextLines:
+    """Accumulates text the way innerText lays it out: one line per block."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._parts: List[str] = []
+
+    def add(self, text: Optional[str]):
+        if text:
+            self._parts.append(text)
+
+    def newline(self):
+        line = " ".join("".join(self._parts).split())
+        if line:
+            self.lines.append(line)
+        self._parts = []
+
+    def text(self) -> str:
+        self.newline()
+        return "\n".join(self.lines)
+
+
+def _data_attrs(attrs) -> Dict[str, str]:
+    return {k[5:]: (v or "") for k, v in attrs if k.startswith("data-")}
+
+
+class _CardHTMLParser(HTMLParser):
+    """Stdlib fallback for extract_cards_html()."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.cards: List[Dict] = []
+        self._card: Optional[_TextLines] = None
+        self._attrs: Dict[str, str] = {}
+        self._card_depth = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._card is None:
+            if _is_property_card(tag, dict(attrs).get("class", "")):
+                self._card = _TextLines()
+                self._attrs = _data_attrs(attrs)
+                self._card_depth = 1
+            return
+        if self._skip_depth:
+            # inside a hidden subtree: only track its nesting
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if _is_hidden(tag, dict(attrs).get("class")):
+            if tag not in VOID_TAGS:
+                self._skip_depth = 1
+            return
+        if tag == "md-card":
+            self._card_depth += 1
+        if tag in BLOCK_TAGS:
+            self._card.newline()
+
+    def handle_endtag(self, tag):
+        if self._card is None:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if tag in BLOCK_TAGS:
+            self._card.newline()
+        if tag == "md-card":
+            self._card_depth -= 1
+            if self._card_depth == 0:
+                self.cards.append({"text": self._card.text(), "attrs": self._attrs})
+                self._card = None
+
+    def handle_data(self, data):
+        if self._card is not None and not self._skip_depth:
+            self._card.add(data)
+
+
+def _lxml_card_text(card) -> str:
+    out = _TextLines()
+
+    def walk(node):
+        # comments / processing instructions have no text in innerText;
+        # the caller still adds their tail
+        if not isinstance(node.tag, str):
+            return
+        tag = node.tag
+        if _is_hidden(tag, node.get("class")):
+            return
+        block = tag in BLOCK_TAGS
+        if block:
+            out.newline()
+        out.add(node.text)
+        for child in node:
+            walk(child)
+            out.add(child.tail)
+        if block:
+            out.newline()
+
+    out.add(card.text)
+    for child in card:
+        walk(child)
+        out.add(child.tail)
+    return out.text()
+
+
+def extract_cards_html(html: str) -> List[Dict]:
+    """
+    Pull every md-card.propertyCard out of raw HTML in one pass.
+
+    Returns the same [{"text", "attrs"}] shape as harvest_cards(), with
+    the text laid out like innerText (one line per block element), so
+    parse_card_text() gives the same result as on the live page. Uses
+    lxml when it is installed, the stdlib HTMLParser otherwise.
+    """
+    if not html or not html.strip():
+        return []
+    if lxml_html is not None:
+        try:
+            doc = lxml_html.fromstring(html)
+        except lxml_etree.ParserError:  # e.g. comment-only: "Document is empty"
+            return []
+        cards = []
+        for el in doc.iter("md-card"):
+            if not _is_property_card("md-card", el.get("class", "")):
+                continue
+            cards.append(
+                {"text": _lxml_card_text(el), "attrs": _data_attrs(el.attrib.items())}
+            )
+        return cards
+
+    parser = _CardHTMLParser()
+    parser.feed(html)
+    parser.close()
+    return parser.cards
+
+
+def harvest_cards(driver) -> List[Dict]:
+    """
+    Return the raw text (and data-* attributes) of every rendered card.
+
+    In "bulk" and "html" modes this is a single execute_script call, no
+    matter how many cards md-virtual-repeat currently has in the DOM.
+    "element" mode keeps the old one-round-trip-per-card behavior for
+    comparison.
+    """
+    if EXTRACT_MODE == "html":
+        return extract_cards_html(driver.execute_script(LIST_HTML_JS) or "")
+    if EXTRACT_MODE == "element":
+        cards = []
+        for el in driver.find_elements(By.CSS_SELECTOR, "md-card.propertyCard"):
+            try:
+                cards.append({"text": el.text or "", "attrs": {}})
+            except Exception:
+                # card was recycled by md-virtual-repeat mid-read
+                continue
+        return cards
+    return driver.execute_script(CARD_EXTRACT_JS) or []
+
+
+# -------------------------------------------------
+# Record & replay
+# -------------------------------------------------
+
+RECORDING_FORMAT = "villages-recording"
+RECORDING_VERSION = 1
+
+
+class Recorder:
+    """
+    Writes one run's raw harvest data to a gzip'd JSON-lines archive.
+
+    Line 1 is a header; then one {"loop", "cards", "html"} line per
+    scroll harvest loop or one {"feed"} line per feed response; the last
+    line is a {"footer"} with the engine stats.
+    """
+
+    def __init__(self, path: str, engine: str, url: str):
+        self.path = path
+        self.loops = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._f = gzip.open(path, "wt", encoding="utf-8")
+        self._write(
+            {
+                "format": RECORDING_FORMAT,
+                "version": RECORDING_VERSION,
+                "engine": engine,
+                "url": url,
+                "recorded_at": datetime.utcnow().isoformat(),
+            }
+        )
+
+    def _write(self, record: Dict):
+        self._f.write(json.dumps(record, separators=(",", ":")))
+        self._f.write("\n")
+
+    def cards(self, cards: List[Dict], html: str):
+        self.loops += 1
+        self._write({"loop": self.loops, "cards": cards, "html": html})
+
+    def feed(self, payload):
+        self._write({"feed": payload})
+
+    def close(self, stats: Dict):
+        footer = {
+            k: v for k, v in stats.items() if isinstance(v, (int, float, str)) or v is None
+        }
+        self._write({"footer": footer})
+        self._f.close()
+        logger.info("Recorded harvest data to %s.", self.path)
+
+
+def open_recorder(engine: str, url: str, tag: str = "") -> Optional[Recorder]:
+    """Recorder for SCRAPE_RECORD_PATH, or None when recording is off."""
+    if not SCRAPE_RECORD_PATH:
+        return None
+    path = SCRAPE_RECORD_PATH.replace("{ts}", datetime.utcnow().strftime("%Y%m%dT%H%M%S"))
+    if tag:
+        # shard workers write side by side: run.jsonl.gz -> run-new.jsonl.gz
+        directory, name = os.path.split(path)
+        stem, dot, ext = name.partition(".")
+        path = os.path.join(directory, f"{stem}-{tag}{dot}{ext}")
+    return Recorder(path, engine, url)
+
+
+def iter_recording(path: str) -> Iterator[Dict]:
+    """Yield the records of an archive written by Recorder."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != RECORDING_FORMAT:
+            raise ValueError(f"{path} is not a listing recording")
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _recorded(engine: str, url: str, stats: Dict, make_iter, tag: str = "") -> Iterator[Listing]:
+    """Run make_iter(recorder) with a Recorder open if SCRAPE_RECORD_PATH is set."""
+    recorder = open_recorder(engine, url, tag)
+    try:
+        yield from make_iter(recorder)
+    finally:
+        if recorder:
+            recorder.close(stats)
+
+
+def _iter_replay(stats: Dict, resume: Dict) -> Iterator[Listing]:
+    """
+    Replay backend: feed a recorded archive through the same parsers
+    (parse_card_text / listing_from_feed_item) with no browser. With
+    SCRAPE_EXTRACT_MODE=html the cards are re-extracted from the recorded
+    list HTML instead of the recorded card texts.
+    """
+    if not SCRAPE_REPLAY_PATH:
+        logger.error("ERROR: SCRAPE_BACKEND=replay needs SCRAPE_REPLAY_PATH – returning empty list.")
+        return
+
+    seen_ids = set(resume.get("seen_ids", ()))
+    strict = not FEED_URL_HINT  # as _iter_network captured it; http runs read the feed URL
+    for record in iter_recording(SCRAPE_REPLAY_PATH):
+        if "engine" in record:
+            strict = strict and record["engine"] != "http"
+            continue
+        if "cards" in record:
+            parsed = []
+            cards = record["cards"]
+            if EXTRACT_MODE == "html":
+                cards = extract_cards_html(record.get("html", ""))
+            for card in cards:
+                try:
+                    parsed.append(parse_card_text(card.get("text", ""), card.get("attrs")))
+                except Exception:
+                    continue
+        elif "feed" in record:
+            parsed = [
+                listing_from_feed_item(item, strict) for item in iter_feed_items(record["feed"])
+            ]
+        else:
+            if "footer" in record:
+                stats["expected_total"] = record["footer"].get("expected_total")
+            continue
+
+        for data in parsed:
+            if data is None:
+                continue
+            uid = data.id
+            if not uid or uid in seen_ids:
+                continue
+            seen_ids.add(uid)
+            yield data
+
+
+# Scrolls the container one viewport (or to a saved offset) and resolves as
+# soon as the virtual repeat container mutates (new cards rendered) or the
+# timeout expires.
+SCROLL_AND_WAIT_JS = """
+var scroller = arguments[0];
+var timeoutMs = arguments[1];
+var jumpTo = arguments[2];
+var done = arguments[arguments.length - 1];
+var target = document.querySelector('md-virtual-repeat-container') || scroller;
+var finished = false;
+var observer, timer;
+function finish(mutated) {
+  if (finished) { return; }
+  finished = true;
+  observer.disconnect();
+  clearTimeout(timer);
+  done({
+    mutated: mutated,
+    scrollTop: scroller.scrollTop,
+    clientHeight: scroller.clientHeight,
+    scrollHeight: scroller.scrollHeight
+  });
+}
+observer = new MutationObserver(function () {
+  // let the digest finish painting before handing control back
+  requestAnimationFrame(function () { finish(true); });
+});
+observer.observe(target, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(function () { finish(false); }, timeoutMs);
+if (jumpTo === null) {
+  scroller.scrollTop = scroller.scrollTop + scroller.clientHeight;
+} else {
+  scroller.scrollTop = jumpTo;
+}
+"""
+
+
+# Returns the result count Homefinder displays, or null if not rendered yet.
+RESULT_COUNT_JS = """
+var selector = arguments[0];
+var text = '';
+if (selector) {
+  var el = document.querySelector(selector);
+  text = el ? el.innerText : '';
+} else {
+  text = document.body ? document.body.innerText : '';
+}
+var m = selector
+  ? text.match(/(\\d[\\d,]*)/)
+  : text.match(/(\\d[\\d,]*)\\s+(homes|results|listings|properties)\\b/i);
+return m ? parseInt(m[1].replace(/,/g, ''), 10) : null;
+"""
+
+
+def read_expected_total(driver) -> Optional[int]:
+    try:
+        total = driver.execute_script(RESULT_COUNT_JS, COUNT_SELECTOR)
+    except Exception:
+        return None
+    return total if isinstance(total, int) and total > 0 else None
+
+
+def _scroll_and_wait(driver, scroll_container, jump_to: Optional[int] = None) -> Dict:
+    return driver.execute_async_script(
+        SCROLL_AND_WAIT_JS, scroll_container, int(RENDER_TIMEOUT_SECONDS * 1000), jump_to
+    )
+
+
+def _iter_scroll(
+    driver, url: str, stats: Dict, resume: Dict, recorder: Optional[Recorder] = None
+) -> Iterator[Listing]:
+    """
+    Scroll engine: harvest the rendered cards from md-content, yielding
+    each new listing as soon as a harvest loop finds it.
+
+    Updated logic:
+    - Loads Homefinder with lat/lng/lvl=1 so map is:
         * Zoom level 1
         * Centered over The Villages
       → this guarantees the list can show ALL listings.
@@ -306,158 +2077,1130 @@ def scrape_listings() -> List[Dict]:
         * Only a handful of cards are in the DOM at once.
         * We scroll the *scroll container* (md-content) to load more.
     - Harvests cards on every scroll and de-duplicates by ID.
+    - Card text is pulled in one execute_script call per loop
+      (see SCRAPE_EXTRACT_MODE) and parsed in pure Python.
+    - Reads the result count Homefinder shows and stops as soon as that
+      many unique listings have been harvested.
     """
-    logger.info("Launching Selenium WebDriver...")
-    driver = make_driver()
+    tally = NetworkTally()
+    # Drop anything left over from earlier navigation
+    driver.get_log("performance")
 
-    try:
-        logger.info(f"Loading Homefinder URL: {HOMEFINDER_URL}")
-        driver.get(HOMEFINDER_URL)
+    logger.info(f"Loading Homefinder URL: {url}")
+    load_started = time.monotonic()
+    driver.get(url)
 
-        wait = WebDriverWait(driver, 30)
+    wait = WebDriverWait(driver, 30)
 
-        # Wait for the scroll container and at least one card
-        try:
-            # Scroll container
-            scroll_container = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "md-content"))
+    # Wait for the scroll container and at least one card
+    try:
+        # Scroll container
+        scroll_container = wait.until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "md-content"))
+        )
+        # First listing card
+        wait.until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, "md-card.propertyCard")
             )
-            # First listing card
-            wait.until(
-                EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, "md-card.propertyCard")
-                )
+        )
+        stats["page_ready_seconds"] = time.monotonic() - load_started
+        tally.drain(driver)
+        stats["page_load_bytes"] = tally.bytes
+        logger.info(
+            "md-content scroll container and first listing card detected – starting scroll harvesting."
+        )
+    except Exception:
+        logger.error(
+            "ERROR: Could not find md-content and/or listing cards – returning empty list."
+        )
+        return
+
+    observer_mode = HARVEST_MODE == "observer"
+    if observer_mode:
+        driver.set_script_timeout(RENDER_TIMEOUT_SECONDS + 10)
+    else:
+        # Let things stabilize a bit
+        time.sleep(2)
+
+    seen_ids = set(resume.get("seen_ids", ()))
+
+    same_count_loops = 0
+    max_same_loops = 8  # safety to exit once we've seen everything
+
+    scrolls = 0
+    render_wait = 0.0
+    end_of_list = False
+
+    expected = read_expected_total(driver)
+    if expected:
+        logger.info("Homefinder reports %d results.", expected)
+
+    if resume.get("scroll_top"):
+        logger.info(
+            "Resuming at scroll offset %d with %d listings already harvested.",
+            resume["scroll_top"],
+            len(seen_ids),
+        )
+        if observer_mode:
+            _scroll_and_wait(driver, scroll_container, resume["scroll_top"])
+        else:
+            driver.execute_script(
+                "arguments[0].scrollTop = arguments[1];", scroll_container, resume["scroll_top"]
             )
+            time.sleep(1.0)
+
+    while True:
+        cards = harvest_cards(driver)
+        if recorder:
+            recorder.cards(cards, driver.execute_script(LIST_HTML_JS) or "")
+        if not expected:
+            # count label may render after the first cards
+            expected = read_expected_total(driver)
+
+        new_this_round = 0
+        for card in cards:
+            try:
+                data = parse_card_text(card.get("text", ""), card.get("attrs"))
+            except Exception:
+                # ignore parsing errors for individual cards
+                continue
+            uid = data.id
+            if not uid:
+                continue
+            if uid in seen_ids:
+                continue
+            seen_ids.add(uid)
+            new_this_round += 1
+            yield data
+
+        logger.info(
+            "Harvest loop: saw %d cards, total unique so far: %d (new_this_round=%d)",
+            len(cards),
+            len(seen_ids),
+            new_this_round,
+        )
+
+        if new_this_round == 0:
+            same_count_loops += 1
+        else:
+            same_count_loops = 0
+
+        # A count scraped from the page text may come from a card and run
+        # low, so only a COUNT_SELECTOR label may end the harvest early;
+        # otherwise it's just recorded for expected-vs-harvested.
+        if COUNT_SELECTOR and expected and len(seen_ids) >= expected:
+            logger.info("Harvested all %d expected listings.", expected)
+            break
+
+        if end_of_list:
+            logger.info("Reached the bottom of the list – all listings loaded.")
+            break
+
+        if same_count_loops >= max_same_loops:
             logger.info(
-                "md-content scroll container and first listing card detected – starting scroll harvesting."
+                "No new cards for several loops – assuming end of list / all listings loaded."
             )
-        except Exception:
-            logger.error(
-                "ERROR: Could not find md-content and/or listing cards – returning empty list."
+            break
+
+        # Scroll the *list container* (md-content) by one viewport height
+        scrolls += 1
+        if observer_mode:
+            wait_started = time.monotonic()
+            state = _scroll_and_wait(driver, scroll_container) or {}
+            render_wait += time.monotonic() - wait_started
+            at_bottom = (
+                state.get("scrollTop", 0) + state.get("clientHeight", 0)
+                >= state.get("scrollHeight", 0) - 1
             )
-            return []
+            # Harvest once more, then stop: nothing left to render below us
+            end_of_list = at_bottom and not state.get("mutated")
+            stats["scroll_top"] = state.get("scrollTop")
+        else:
+            stats["scroll_top"] = driver.execute_script(
+                "arguments[0].scrollTop = arguments[0].scrollTop + arguments[0].clientHeight;"
+                "return arguments[0].scrollTop;",
+                scroll_container,
+            )
+            time.sleep(1.0)
 
-        # Let things stabilize a bit
-        time.sleep(2)
+    if observer_mode:
+        # What the sleep mode would have spent: 2s settle, 1s per scroll,
+        # plus the idle tail it needs to notice the end of the list.
+        fixed_sleeps = 2.0 + 1.0 * (scrolls + max_same_loops)
+        logger.info(
+            "Observer harvesting: %d scrolls, waited %.1fs for renders vs ~%.1fs of fixed sleeps (saved ~%.1fs).",
+            scrolls,
+            render_wait,
+            fixed_sleeps,
+            fixed_sleeps - render_wait,
+        )
 
-        seen_ids = set()
-        results: List[Dict] = []
+    tally.drain(driver)
+    stats["bytes_transferred"] = tally.bytes
+    stats["requests"] = tally.requests
+    stats["blocked_requests"] = tally.blocked
+    stats["expected_total"] = expected
+    logger.info("Scraped %d unique listings in total.", len(seen_ids))
+
+
+# Lower-cased feed keys that may carry each listing field.
+FEED_FIELDS = {
+    "id": ("listingnumber", "listingid", "mlsnumber", "vnh", "vls", "propertyid", "id"),
+    "status": ("status", "listingstatus", "salestatus"),
+    "type": ("listingtype", "hometype", "type"),
+    "village": ("village", "villagename", "neighborhood", "community"),
+    "title": ("title", "address", "streetaddress", "name"),
+    "lat": ("latitude", "lat"),
+    "lng": ("longitude", "lng", "lon", "long"),
+}
 
-        same_count_loops = 0
-        max_same_loops = 8  # safety to exit once we've seen everything
 
-        while True:
-            cards = driver.find_elements(By.CSS_SELECTOR, "md-card.propertyCard")
+def _feed_value(item: Dict, field: str) -> str:
+    lowered = {str(k).lower(): v for k, v in item.items()}
+    for key in FEED_FIELDS[field]:
+        value = lowered.get(key)
+        if value not in (None, "") and not isinstance(value, (dict, list)):
+            return str(value).strip()
+    return ""
 
-            new_this_round = 0
-            for card in cards:
+
+def listing_from_feed_item(item: Dict, strict: bool = False) -> Optional[Listing]:
+    """
+    Build the same Listing parse_card_text() returns from one JSON record of
+    the Homefinder listing feed.
+
+    IDs go through normalize_id_line() so VNH/VLS numbers match the ones
+    harvested from card text. With strict (JSON captured without a
+    HOMEFINDER_FEED_HINT, so possibly not the feed at all) records whose
+    ID isn't a VNH/VLS number give None.
+    """
+    raw_id = _feed_value(item, "id").upper()
+    for prefix in ("VNH", "VLS"):
+        if raw_id.startswith(prefix) and not raw_id.startswith(prefix + "#"):
+            raw_id = f"{prefix}#{raw_id[len(prefix):]}"
+    id_info = normalize_id_line(raw_id)
+    if strict and not id_info["id"]:
+        return None
+    uid = id_info["id"] or "".join(ch for ch in raw_id if ch.isalnum())
+
+    list_type = id_info["type"]
+    if not list_type:
+        raw_type = _feed_value(item, "type").lower()
+        list_type = "new" if ("new" in raw_type or "model" in raw_type) else "preowned"
+
+    raw_status = _feed_value(item, "status").lower()
+    status = "pending" if ("pending" in raw_status or "contract" in raw_status) else "active"
+
+    # Cards show "The Village of X"; keep the feed consistent with that
+    village = _feed_value(item, "village")
+    if village and "village of" not in village.lower():
+        village = f"The Village of {village}"
+
+    lat = _coord(_feed_value(item, "lat"))
+    lng = _coord(_feed_value(item, "lng"))
+
+    return Listing(
+        uid,
+        (_feed_value(item, "title") or uid)[:120],
+        status,
+        list_type,
+        village,
+        classify_listing_region(village, lat, lng),
+        lat,
+        lng,
+    )
+
+
+def iter_feed_items(payload):
+    """
+    Yield listing-shaped records from an arbitrary JSON payload.
+
+    The feed schema isn't documented, so walk the structure and pick out
+    every list of objects whose entries carry an id-like key.
+    """
+    if isinstance(payload, list):
+        if payload and all(isinstance(x, dict) for x in payload) and any(
+            _feed_value(x, "id") for x in payload
+        ):
+            yield from payload
+            return
+        for x in payload:
+            yield from iter_feed_items(x)
+    elif isinstance(payload, dict):
+        for value in payload.values():
+            yield from iter_feed_items(value)
+
+
+FEED_TOTAL_KEYS = ("total", "totalcount", "totalresults", "count", "resultcount")
+
+
+def feed_total(payload) -> Optional[int]:
+    """Total listing count advertised by a feed response, if any."""
+    if not isinstance(payload, dict):
+        return None
+    nested = []
+    for key, value in payload.items():
+        if str(key).lower() in FEED_TOTAL_KEYS and isinstance(value, int):
+            return value
+        if isinstance(value, dict):
+            nested.append(value)
+    for value in nested:
+        total = feed_total(value)
+        if total is not None:
+            return total
+    return None
+
+
+def _response_json(driver, request_id: str):
+    body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+    text = body.get("body", "")
+    if body.get("base64Encoded"):
+        text = base64.b64decode(text).decode("utf-8", errors="replace")
+    return json.loads(text)
+
+
+def _iter_network(
+    driver, url: str, stats: Dict, resume: Dict, recorder: Optional[Recorder] = None
+) -> Iterator[Listing]:
+    """
+    Network engine: capture the listing feed as the page loads, yielding
+    listings as each feed response arrives.
+
+    Reads CDP Network.responseReceived / Network.loadingFinished events
+    from the performance log, fetches each JSON body with
+    Network.getResponseBody and maps the records with
+    listing_from_feed_item(). Stops once the feed goes quiet for
+    FEED_IDLE_SECONDS (or FEED_TIMEOUT_SECONDS overall), or as soon as
+    the feed's advertised total has been collected.
+    """
+    tally = NetworkTally()
+    # Drop anything left over from earlier navigation
+    driver.get_log("performance")
+
+    logger.info(f"Loading Homefinder URL (network capture): {url}")
+    started = time.monotonic()
+    driver.get(url)
+
+    last_feed_at = started
+    json_requests: Dict[str, str] = {}
+    feed_urls = set()
+    seen_ids = set(resume.get("seen_ids", ()))
+    expected = None
+
+    while True:
+        now = time.monotonic()
+        if expected and len(seen_ids) >= expected:
+            break
+        if now - started > FEED_TIMEOUT_SECONDS:
+            logger.warning("Network capture timed out after %.0fs.", now - started)
+            break
+        if seen_ids and now - last_feed_at > FEED_IDLE_SECONDS:
+            break
+
+        for message in read_performance_log(driver):
+            tally.feed(message)
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                response_url = response.get("url", "")
+                if "json" in response.get("mimeType", "") and FEED_URL_HINT in response_url:
+                    json_requests[params.get("requestId")] = response_url
+            elif method == "Network.loadingFinished":
+                request_id = params.get("requestId")
+                response_url = json_requests.pop(request_id, None)
+                if response_url is None:
+                    continue
                 try:
-                    data = parse_card(card)
-                    uid = data["id"]
-                    if not uid:
-                        continue
-                    if uid in seen_ids:
-                        continue
-                    seen_ids.add(uid)
-                    results.append(data)
-                    new_this_round += 1
+                    payload = _response_json(driver, request_id)
                 except Exception:
-                    # ignore parsing errors for individual cards
                     continue
+                if recorder:
+                    recorder.feed(payload)
 
-            logger.info(
-                "Harvest loop: saw %d cards, total unique so far: %d (new_this_round=%d)",
-                len(cards),
-                len(results),
-                new_this_round,
-            )
+                listings_this_response = new_this_response = 0
+                for item in iter_feed_items(payload):
+                    data = listing_from_feed_item(item, strict=not FEED_URL_HINT)
+                    if data is None or not data.id:
+                        continue
+                    listings_this_response += 1
+                    if data.id in seen_ids:
+                        continue
+                    seen_ids.add(data.id)
+                    new_this_response += 1
+                    yield data
+
+                # any other JSON may carry a "count" too
+                if listings_this_response:
+                    expected = expected or feed_total(payload)
+
+                if new_this_response:
+                    feed_urls.add(response_url.split("?")[0])
+                    last_feed_at = time.monotonic()
+                    if "page_ready_seconds" not in stats:
+                        stats["page_ready_seconds"] = last_feed_at - started
+                        stats["page_load_bytes"] = tally.bytes
+                    logger.info(
+                        "Feed response %s: %d new listings, total unique so far: %d",
+                        response_url,
+                        new_this_response,
+                        len(seen_ids),
+                    )
+
+        time.sleep(0.25)
+
+    if feed_urls:
+        logger.info("Listing feed endpoint(s): %s", ", ".join(sorted(feed_urls)))
+    stats["bytes_transferred"] = tally.bytes
+    stats["requests"] = tally.requests
+    stats["blocked_requests"] = tally.blocked
+    stats["expected_total"] = expected
+    logger.info(
+        "Network capture collected %d unique listings in %.1fs.",
+        len(seen_ids),
+        time.monotonic() - started,
+    )
 
-            if new_this_round == 0:
-                same_count_loops += 1
-            else:
-                same_count_loops = 0
 
-            if same_count_loops >= max_same_loops:
-                logger.info(
-                    "No new cards for several loops – assuming end of list / all listings loaded."
+_http_session = None
+
+
+def get_http_session() -> requests.Session:
+    """
+    Shared keep-alive session for the http backend.
+
+    Connections are pooled across pages and across runs, with a few
+    retries on transient gateway errors.
+    """
+    global _http_session
+    if _http_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504)
+            ),
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(
+            {
+                "Accept": "application/json",
+                "User-Agent": "villages-listing-tracker/1.0",
+            }
+        )
+        _http_session = session
+    return _http_session
+
+
+def _iter_http(stats: Dict, resume: Dict, recorder: Optional[Recorder] = None) -> Iterator[Listing]:
+    """
+    HTTP backend: page through the listing feed without a browser.
+
+    Stops at the first short page, a page that adds no new IDs (so a
+    feed that ignores the paging params can't loop forever), or once the
+    feed's advertised total has been collected.
+    """
+    if not HOMEFINDER_FEED_URL:
+        logger.error("ERROR: SCRAPE_BACKEND=http needs HOMEFINDER_FEED_URL – returning empty list.")
+        return
+
+    session = get_http_session()
+    started = time.monotonic()
+    seen_ids = set(resume.get("seen_ids", ()))
+    # IDs met on this pass, so resumed IDs don't look like a stuck feed
+    pass_ids = set()
+    expected = None
+    page = FEED_FIRST_PAGE
+
+    while True:
+        params = {}
+        if FEED_PAGE_PARAM:
+            params[FEED_PAGE_PARAM] = page
+            if FEED_PAGE_SIZE_PARAM:
+                params[FEED_PAGE_SIZE_PARAM] = FEED_PAGE_SIZE
+
+        resp = session.get(HOMEFINDER_FEED_URL, params=params, timeout=30)
+        resp.raise_for_status()
+        payload = resp.json()
+        if recorder:
+            recorder.feed(payload)
+        expected = expected or feed_total(payload)
+        items = list(iter_feed_items(payload))
+
+        new_this_page = 0
+        for item in items:
+            data = listing_from_feed_item(item)
+            uid = data.id
+            if not uid or uid in pass_ids:
+                continue
+            pass_ids.add(uid)
+            new_this_page += 1
+            if uid in seen_ids:
+                continue
+            seen_ids.add(uid)
+            yield data
+
+        logger.info(
+            "Feed page %s: %d records, total unique so far: %d (new_this_page=%d)",
+            page,
+            len(items),
+            len(seen_ids),
+            new_this_page,
+        )
+
+        if not FEED_PAGE_PARAM or new_this_page == 0 or len(items) < FEED_PAGE_SIZE:
+            break
+        if expected and len(seen_ids) >= expected:
+            break
+        page += 1
+
+    stats["expected_total"] = expected
+    logger.info(
+        "HTTP backend collected %d unique listings in %.1fs.",
+        len(seen_ids),
+        time.monotonic() - started,
+    )
+
+
+def _iter_browser(
+    url: str,
+    stats: Dict,
+    resume: Optional[Dict] = None,
+    recorder: Optional[Recorder] = None,
+) -> Iterator[Listing]:
+    """
+    One Chrome pass over `url` with the engine picked by SCRAPE_ENGINE.
+
+    The network engine falls back to scroll harvesting if it could not
+    find any listing feed in the captured traffic.
+    """
+    resume = resume or {}
+    with driver_pool.driver() as driver:
+        found = 0
+        if SCRAPE_ENGINE == "network":
+            for data in _iter_network(driver, url, stats, resume, recorder):
+                found += 1
+                yield data
+            if not found:
+                logger.warning(
+                    "No listing feed captured – falling back to scroll harvesting."
                 )
-                break
+        if not found:
+            yield from _iter_scroll(driver, url, stats, resume, recorder)
 
-            # Scroll the *list container* (md-content) by one viewport height
-            driver.execute_script(
-                "arguments[0].scrollTop = arguments[0].scrollTop + arguments[0].clientHeight;",
-                scroll_container,
-            )
-            time.sleep(1.0)
+    if "page_ready_seconds" in stats:
+        logger.info(
+            "Resource blocking %s: page ready in %.1fs (%.0f KB), "
+            "%.0f KB over %d requests for the whole run, %d blocked.",
+            "on" if BLOCK_RESOURCES else "off",
+            stats["page_ready_seconds"],
+            stats.get("page_load_bytes", 0) / 1024.0,
+            stats.get("bytes_transferred", 0) / 1024.0,
+            stats.get("requests", 0),
+            stats.get("blocked_requests", 0),
+        )
 
-        logger.info("Scraped %d unique listings in total.", len(results))
-        return results
 
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+# -------------------------------------------------
+# Sharded scraping
+# -------------------------------------------------
 
 
-def run_count() -> Dict:
-    listings = scrape_listings()
+def _with_query(url: str, drop=(), replace: Optional[Dict[str, str]] = None) -> str:
+    """
+    Rewrite Homefinder's query string token by token.
 
-    total_active = sum(
-        1 for r in listings if r.get("status", "").lower() == "active"
+    The SPA uses bare flags ("&new&preowned"), which urllib would mangle,
+    so tokens are edited as raw "key" / "key=value" strings.
+    """
+    base, _, query = url.partition("?")
+    replace = dict(replace or {})
+    tokens = []
+    for token in query.split("&"):
+        if not token:
+            continue
+        key = token.split("=", 1)[0]
+        if key in drop:
+            continue
+        if key in replace:
+            token = f"{key}={replace.pop(key)}"
+        tokens.append(token)
+    tokens.extend(f"{key}={value}" for key, value in replace.items())
+    return f"{base}?{'&'.join(tokens)}"
+
+
+def build_shards(spec: str, url: str) -> List[Dict]:
+    """
+    Turn a SCRAPE_SHARDS spec into [{"name", "url", "disjoint"}] slices.
+
+    "disjoint" marks slices that can't overlap, so their advertised
+    totals add up to the full expected total.
+    """
+    if spec == "type":
+        return [
+            {"name": "new", "url": _with_query(url, drop=("preowned",)), "disjoint": True},
+            {"name": "preowned", "url": _with_query(url, drop=("new",)), "disjoint": True},
+        ]
+
+    if spec.startswith("grid:"):
+        n = max(1, int(spec.split(":", 1)[1]))
+        lat_step = SHARD_SPAN_LAT / n
+        lng_step = SHARD_SPAN_LNG / n
+        south = VILLAGES_LAT - SHARD_SPAN_LAT / 2
+        west = VILLAGES_LNG - SHARD_SPAN_LNG / 2
+        shards = []
+        for row in range(n):
+            for col in range(n):
+                lat = south + (row + 0.5) * lat_step
+                lng = west + (col + 0.5) * lng_step
+                shards.append(
+                    {
+                        "name": f"grid-{row}-{col}",
+                        "url": _with_query(
+                            url,
+                            replace={"lat": f"{lat:.6f}", "lng": f"{lng:.6f}", "lvl": SHARD_GRID_LVL},
+                        ),
+                        # map viewports overlap at the edges
+                        "disjoint": False,
+                    }
+                )
+        return shards
+
+    raise ValueError(f"Unknown SCRAPE_SHARDS spec: {spec!r}")
+
+
+def _scrape_shard(name: str, url: str):
+    """Process-pool worker: one slice with its own Chrome driver."""
+    stats: Dict = {}
+    started = time.monotonic()
+    results = list(
+        _recorded(
+            "selenium", url, stats, lambda rec: _iter_browser(url, stats, recorder=rec), tag=name
+        )
     )
-    total_pending = sum(
-        1 for r in listings if r.get("status", "").lower() == "pending"
+    logger.info(
+        "Shard %s: %d listings in %.1fs.", name, len(results), time.monotonic() - started
+    )
+    return results, stats
+
+
+def _iter_sharded(stats: Dict, resume: Dict) -> Iterator[Listing]:
+    """
+    Run every shard in a spawn-based process pool and merge the results.
+
+    Each shard's listings are yielded as soon as that shard finishes,
+    de-duplicated by their normalized ID (first one wins); a failed shard
+    is logged and the remaining shards are still merged.
+    """
+    shards = build_shards(SCRAPE_SHARDS, HOMEFINDER_URL)
+    workers = max(1, min(SCRAPE_WORKERS, len(shards)))
+    logger.info("Scraping %d shards (%s) with %d workers.", len(shards), SCRAPE_SHARDS, workers)
+
+    seen_ids = set(resume.get("seen_ids", ()))
+    expected_total: Optional[int] = 0
+    failed = []
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        # workers are spawned by submit() and inherit the environment then
+        os.environ[SHARD_WORKER_ENV] = "1"
+        try:
+            futures = {
+                pool.submit(_scrape_shard, shard["name"], shard["url"]): shard
+                for shard in shards
+            }
+        finally:
+            del os.environ[SHARD_WORKER_ENV]
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                results, shard_stats = future.result()
+            except Exception as e:
+                logger.error(f"Shard {shard['name']} failed: {e}")
+                failed.append(shard["name"])
+                continue
+
+            shard_expected = shard_stats.get("expected_total")
+            if shard["disjoint"] and shard_expected is not None and expected_total is not None:
+                expected_total += shard_expected
+            else:
+                expected_total = None
+
+            for data in results:
+                if data.id in seen_ids:
+                    continue
+                seen_ids.add(data.id)
+                yield data
+
+    stats["expected_total"] = expected_total if not failed else None
+    stats["failed_shards"] = failed
+    logger.info(
+        "Merged %d unique listings from %d shards (%d failed).",
+        len(seen_ids),
+        len(shards),
+        len(failed),
     )
 
-    # group by region and then village (alphabetical inside region)
-    grouped: Dict[str, Dict[str, Dict[str, int]]] = {}
-    for r in listings:
-        region = r.get("region") or classify_region(r.get("village", ""))
-        village = r.get("village") or "Unknown"
-        status = r.get("status", "active").lower()
 
-        region_dict = grouped.setdefault(region, {})
-        village_dict = region_dict.setdefault(
-            village, {"active": 0, "pending": 0, "total": 0}
+def iter_listings(stats: Optional[Dict] = None, resume: Optional[Dict] = None) -> Iterator[Listing]:
+    """
+    Core scraping logic, as a stream of parsed listings.
+
+    With SCRAPE_BACKEND=http the feed is fetched directly, and with
+    SCRAPE_BACKEND=replay a recorded archive is re-parsed. Otherwise
+    Chrome loads HOMEFINDER_URL – once, or as parallel slices when
+    SCRAPE_SHARDS is set. SCRAPE_RECORD_PATH records the raw harvest
+    data of live runs. Listings are unique by ID and yielded as they
+    are found, so consumers can write them out while scraping continues.
+
+    If a `stats` dict is passed, the engine fills in "expected_total"
+    (the count Homefinder advertises, or None if it couldn't be read) and,
+    for Chrome runs, page_ready_seconds / bytes_transferred / requests /
+    blocked_requests – once the generator is exhausted. The scroll engine
+    also keeps stats["scroll_top"] current for checkpointing.
+
+    `resume` ({"seen_ids", "scroll_top"}, see load_checkpoint()) carries
+    on an interrupted run: those IDs are not yielded again and the scroll
+    engine jumps straight to the saved offset.
+    """
+    if stats is None:
+        stats = {}
+    resume = resume or {}
+    if SCRAPE_BACKEND == "replay":
+        return _iter_replay(stats, resume)
+    if SCRAPE_BACKEND == "http":
+        return _recorded(
+            "http", HOMEFINDER_FEED_URL, stats, lambda rec: _iter_http(stats, resume, rec)
         )
+    if SCRAPE_SHARDS:
+        return _iter_sharded(stats, resume)
+    return _recorded(
+        "selenium",
+        HOMEFINDER_URL,
+        stats,
+        lambda rec: _iter_browser(HOMEFINDER_URL, stats, resume, rec),
+    )
+
+
+def scrape_listings(stats: Optional[Dict] = None) -> List[Listing]:
+    """All listings from iter_listings() as one list."""
+    return list(iter_listings(stats))
 
-        if status == "active":
-            village_dict["active"] += 1
-        elif status == "pending":
-            village_dict["pending"] += 1
-        village_dict["total"] += 1
 
-    # sort villages inside each region alphabetically
+# -------------------------------------------------
+# Aggregation & run storage
+# -------------------------------------------------
+
+
+def add_to_grouped(grouped: Dict[str, Dict[str, Dict[str, int]]], r: Listing):
+    """Count one listing into a region -> village -> counters mapping."""
+    region_dict = grouped.get(r.region)
+    village_dict = region_dict.get(r.village or "Unknown") if region_dict else None
+    if village_dict is None:
+        add_counts(grouped, r.region, r.village, r.status)
+        return
+    if r.status == "active":
+        village_dict["active"] += 1
+    elif r.status == "pending":
+        village_dict["pending"] += 1
+    village_dict["total"] += 1
+
+
+def add_counts(
+    grouped: Dict[str, Dict[str, Dict[str, int]]],
+    region: str,
+    village: str,
+    status: str,
+    n: int = 1,
+):
+    """Count n listings of one region / village / lowercase status."""
+    region_dict = grouped.setdefault(region or classify_region(village or ""), {})
+    village_dict = region_dict.setdefault(
+        village or "Unknown", {"active": 0, "pending": 0, "total": 0}
+    )
+
+    status = status or "active"
+    if status == "active":
+        village_dict["active"] += n
+    elif status == "pending":
+        village_dict["pending"] += n
+    village_dict["total"] += n
+
+
+def sort_grouped(
+    grouped: Dict[str, Dict[str, Dict[str, int]]]
+) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Sort villages inside each region alphabetically."""
     grouped_sorted: Dict[str, Dict[str, Dict[str, int]]] = {}
     for region, villages in grouped.items():
         grouped_sorted[region] = dict(sorted(villages.items(), key=lambda kv: kv[0]))
+    return grouped_sorted
 
-    row = {
-        "run_at": datetime.utcnow().isoformat(),
-        "total_active": total_active,
-        "total_pending": total_pending,
-        "grouped": grouped_sorted,
+
+def find_resumable_run(c) -> Optional[int]:
+    """
+    The newest run, if it never completed and its checkpoint is recent.
+
+    A "running" run whose checkpoint is still fresh may be alive in
+    another process, so it is only taken over once it has been quiet
+    for a few checkpoint intervals.
+    """
+    c.execute("SELECT id, state FROM daily_counts ORDER BY id DESC LIMIT 1")
+    row = c.fetchone()
+    if not row or row[1] not in ("running", "failed"):
+        return None
+    run_id, state = row
+
+    c.execute("SELECT updated_at FROM scrape_checkpoints WHERE run_id = ?", (run_id,))
+    checkpoint = c.fetchone()
+    if not checkpoint:
+        return None
+    age = (datetime.utcnow() - datetime.fromisoformat(checkpoint[0])).total_seconds()
+    if age > RESUME_MAX_AGE_MINUTES * 60:
+        logger.info("Checkpoint of run %d is %.0f min old – starting fresh.", run_id, age / 60)
+        return None
+    if state == "running" and age < max(60.0, 4 * CHECKPOINT_INTERVAL_SECONDS):
+        logger.info("Run %d checkpointed %.0fs ago and may still be running.", run_id, age)
+        return None
+    return run_id
+
+
+def load_checkpoint(c, run_id: int) -> Dict:
+    """
+    Rebuild an unfinished run's state: run_at, totals, grouped counters,
+    the IDs already harvested and the last scroll offset.
+    """
+    c.execute(
+        "SELECT run_at, total_active, total_pending, harvested_total "
+        "FROM daily_counts WHERE id = ?",
+        (run_id,),
+    )
+    run_at, total_active, total_pending, harvested_total = c.fetchone()
+    c.execute("SELECT scroll_top FROM scrape_checkpoints WHERE run_id = ?", (run_id,))
+    row = c.fetchone()
+
+    grouped: Dict[str, Dict[str, Dict[str, int]]] = {}
+    seen_ids = set()
+    c.execute(
+        "SELECT listing_id, status, village, region FROM listing_snapshots WHERE run_id = ?",
+        (run_id,),
+    )
+    for listing_id, status, village, region in c:
+        seen_ids.add(listing_id)
+        add_counts(grouped, region, village, status)
+
+    return {
+        "run_at": run_at,
+        "totals": {
+            "active": total_active or 0,
+            "pending": total_pending or 0,
+            "harvested": harvested_total or 0,
+        },
+        "grouped": grouped,
+        "seen_ids": seen_ids,
+        "scroll_top": row[0] if row else None,
     }
 
-    conn = sqlite3.connect(DB_PATH)
+
+def live_run(c) -> Optional[int]:
+    """
+    The newest "running" run if it checkpointed (or started) recently
+    enough that another process may still be scraping it.
+    """
+    c.execute(
+        "SELECT d.id, COALESCE(k.updated_at, d.run_at) FROM daily_counts d "
+        "LEFT JOIN scrape_checkpoints k ON k.run_id = d.id "
+        "WHERE d.state = 'running' ORDER BY d.id DESC LIMIT 1"
+    )
+    row = c.fetchone()
+    if not row:
+        return None
+    age = (datetime.utcnow() - datetime.fromisoformat(row[1])).total_seconds()
+    return row[0] if age < max(60.0, 4 * CHECKPOINT_INTERVAL_SECONDS) else None
+
+
+# One run at a time per process; live_run() covers other processes
+_run_lock = threading.Lock()
+
+
+def run_count(resume: bool = False) -> Dict:
+    """
+    Run _run_count() unless a run is already going, here or (going by a
+    fresh "running" row) in another process. Runs are folded into
+    listing_spans in id order, so they must not overlap.
+    """
+    if not _run_lock.acquire(blocking=False):
+        raise RuntimeError("A run is already in progress.")
+    try:
+        return _run_count(resume)
+    finally:
+        _run_lock.release()
+
+
+def _run_count(resume: bool = False) -> Dict:
+    """
+    Scrape, store and aggregate one run.
+
+    Listings are consumed from iter_listings() as they are found and
+    written to listing_snapshots in batches of RUN_BATCH_SIZE (or every
+    CHECKPOINT_INTERVAL_SECONDS), with the run's totals and a checkpoint
+    updated in the same transaction. The daily_counts row is created up
+    front in state "running" and only marked "complete" at the end, so a
+    crash leaves the partial run in the DB (as "failed", or still
+    "running" if the process was killed).
+
+    With resume=True, a recent unfinished run is continued from its
+    checkpoint instead of starting a new one.
+    """
+    stats: Dict = {}
+
+    conn = get_db()
     c = conn.cursor()
+
+    run_id = find_resumable_run(c) if resume else None
+    checkpoint: Optional[Dict] = None
+    if run_id is not None:
+        checkpoint = load_checkpoint(c, run_id)
+        run_at = checkpoint["run_at"]
+        grouped = checkpoint["grouped"]
+        totals = checkpoint["totals"]
+        logger.info(
+            "Resuming run %d from %s (%d listings already stored).",
+            run_id,
+            run_at,
+            totals["harvested"],
+        )
+        c.execute("UPDATE daily_counts SET state = 'running' WHERE id = ?", (run_id,))
+        # keep the saved offset until the engine scrolls past it
+        stats["scroll_top"] = checkpoint["scroll_top"]
+    else:
+        other = live_run(c)
+        if other is not None:
+            raise RuntimeError(f"Run {other} is still in progress.")
+        now = datetime.now(timezone.utc)
+        run_at = now.replace(tzinfo=None).isoformat()
+        grouped = {}
+        totals = {"active": 0, "pending": 0, "harvested": 0}
+        c.execute(
+            "INSERT INTO daily_counts("
+            "run_at, run_at_epoch, total_active, total_pending, harvested_total, state) "
+            "VALUES (?, ?, 0, 0, 0, 'running')",
+            (run_at, int(now.timestamp())),
+        )
+        run_id = c.lastrowid
+    conn.commit()
+
+    batch: List[Listing] = []
+    last_flush = time.monotonic()
+
+    def flush():
+        nonlocal last_flush
+        c.executemany(
+            """
+            INSERT INTO listing_snapshots(
+                run_id, listing_id, title, status, type, village, region, lat, lng
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [(run_id,) + r.to_row() for r in batch],
+        )
+        c.execute(
+            "UPDATE daily_counts SET total_active = ?, total_pending = ?, harvested_total = ? "
+            "WHERE id = ?",
+            (totals["active"], totals["pending"], totals["harvested"], run_id),
+        )
+        c.execute(
+            "INSERT OR REPLACE INTO scrape_checkpoints(run_id, updated_at, scroll_top) "
+            "VALUES (?, ?, ?)",
+            (run_id, datetime.utcnow().isoformat(), stats.get("scroll_top")),
+        )
+        conn.commit()
+        batch.clear()
+        last_flush = time.monotonic()
+
+    try:
+        for r in iter_listings(stats, resume=checkpoint):
+            status = r.status
+            if status == "active":
+                totals["active"] += 1
+            elif status == "pending":
+                totals["pending"] += 1
+            totals["harvested"] += 1
+            add_to_grouped(grouped, r)
+
+            batch.append(r)
+            if (
+                len(batch) >= RUN_BATCH_SIZE
+                or time.monotonic() - last_flush >= CHECKPOINT_INTERVAL_SECONDS
+            ):
+                flush()
+        flush()
+    except Exception:
+        try:
+            flush()
+            c.execute("UPDATE daily_counts SET state = 'failed' WHERE id = ?", (run_id,))
+            conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+        raise
+
+    harvested = totals["harvested"]
+    expected_total = stats.get("expected_total")
+    if expected_total is None:
+        logger.info("Harvested %d listings (expected total unknown).", harvested)
+    elif harvested < expected_total:
+        logger.warning(
+            "Harvested %d of %d expected listings – run may be incomplete.",
+            harvested,
+            expected_total,
+        )
+    else:
+        logger.info("Harvested %d of %d expected listings.", harvested, expected_total)
+
+    write_run_aggregates(c, run_id, grouped)
+    if STORE_RUN_PAYLOADS:
+        store_run_payload(c, run_id)
+    apply_run_to_spans(c, run_id)
     c.execute(
-        """
-        INSERT INTO daily_counts(run_at, total_active, total_pending, payload_json)
-        VALUES (?, ?, ?, ?)
-        """,
-        (
-            row["run_at"],
-            row["total_active"],
-            row["total_pending"],
-            json.dumps(listings),
-        ),
+        "UPDATE daily_counts SET state = 'complete', expected_total = ? WHERE id = ?",
+        (expected_total, run_id),
+    )
+    c.execute("DELETE FROM scrape_checkpoints WHERE run_id = ?", (run_id,))
+    conn.commit()
+
+    return {
+        "run_at": run_at,
+        "total_active": totals["active"],
+        "total_pending": totals["pending"],
+        "expected_total": expected_total,
+        "harvested_total": harvested,
+        "grouped": sort_grouped(grouped),
+    }
+
+
+# -------------------------------------------------
+# Compaction & rollups
+# -------------------------------------------------
+
+# SQL for the start of a run's week (Monday; 1970-01-05 was one) or month
+_PERIOD_SQL = {
+    "week": "(({col} - 345600) / 604800) * 604800 + 345600",
+    "month": "CAST(strftime('%s', {col}, 'unixepoch', 'start of month') AS INTEGER)",
+}
+
+
+def period_start(epoch: int, period: str) -> int:
+    if period == "week":
+        return (epoch - 345600) // 604800 * 604800 + 345600
+    dt = datetime.fromtimestamp(epoch, timezone.utc)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp())
+
+
+def _archive_payloads(c, cutoff: int) -> int:
+    c.execute(
+        "SELECT id, run_at, payload FROM daily_counts "
+        "WHERE run_at_epoch < ? AND payload IS NOT NULL",
+        (cutoff,),
+    )
+    rows = c.fetchall()
+    if not rows:
+        return 0
+    os.makedirs(COMPACT_ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(
+        COMPACT_ARCHIVE_DIR, f"payloads-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.jsonl.gz"
+    )
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for run_id, run_at, payload in rows:
+            record = {"run_id": run_id, "run_at": run_at}
+            record["payload"] = base64.b64encode(payload).decode("ascii")
+            f.write(json.dumps(record) + "\n")
+    logger.info("Archived %d run payloads to %s.", len(rows), path)
+    return len(rows)
+
+
+def compact_history(now: Optional[float] = None) -> Dict:
+    """
+    Roll completed runs older than RETAIN_DETAIL_DAYS (rounded down to a
+    week boundary, so weeks are compacted whole) into rollup_counts /
+    rollup_aggregates, then delete those runs with their aggregates,
+    payloads and any listing spans that ended before the oldest kept run.
+    """
+    now = int(now or time.time())
+    cutoff = period_start(now - RETAIN_DETAIL_DAYS * 86400, "week")
+    conn = get_db()
+    c = conn.cursor()
+
+    for period, bucket in _PERIOD_SQL.items():
+        c.execute(
+            f"""
+            INSERT INTO rollup_counts(
+                period, period_start, runs, active_sum, pending_sum, harvested_sum, last_run_at
+            )
+            SELECT ?, {bucket.format(col="run_at_epoch")}, COUNT(*), SUM(total_active),
+                   SUM(total_pending), SUM(COALESCE(harvested_total, total_active + total_pending)),
+                   MAX(run_at)
+            FROM daily_counts WHERE {COMPLETE_RUN} AND run_at_epoch < ?
+            GROUP BY 2
+            ON CONFLICT(period, period_start) DO UPDATE SET
+                runs = runs + excluded.runs,
+                active_sum = active_sum + excluded.active_sum,
+                pending_sum = pending_sum + excluded.pending_sum,
+                harvested_sum = harvested_sum + excluded.harvested_sum,
+                last_run_at = MAX(last_run_at, excluded.last_run_at)
+            """,
+            (period, cutoff),
+        )
+        c.execute(
+            f"""
+            INSERT INTO rollup_aggregates(
+                period, period_start, region, village, active_sum, pending_sum, total_sum
+            )
+            SELECT ?, {bucket.format(col="d.run_at_epoch")}, a.region, a.village,
+                   SUM(a.active), SUM(a.pending), SUM(a.total)
+            FROM run_aggregates a JOIN daily_counts d ON d.id = a.run_id
+            WHERE {COMPLETE_RUN} AND d.run_at_epoch < ?
+            GROUP BY 2, 3, 4
+            ON CONFLICT(period, period_start, region, village) DO UPDATE SET
+                active_sum = active_sum + excluded.active_sum,
+                pending_sum = pending_sum + excluded.pending_sum,
+                total_sum = total_sum + excluded.total_sum
+            """,
+            (period, cutoff),
+        )
+
+    archived = _archive_payloads(c, cutoff) if COMPACT_ARCHIVE_DIR else 0
+    old_runs = "SELECT id FROM daily_counts WHERE run_at_epoch < ?"
+    for table in ("run_aggregates", "listing_snapshots", "scrape_checkpoints"):
+        c.execute(f"DELETE FROM {table} WHERE run_id IN ({old_runs})", (cutoff,))
+    c.execute("DELETE FROM daily_counts WHERE run_at_epoch < ?", (cutoff,))
+    runs = c.rowcount
+    c.execute(
+        "DELETE FROM listing_spans WHERE valid_to_run <= "
+        f"(SELECT MIN(id) FROM daily_counts WHERE {COMPLETE_RUN})"
     )
+    spans = c.rowcount
+
+    weekly_cutoff = now - ROLLUP_WEEKLY_DAYS * 86400
+    for table in ("rollup_counts", "rollup_aggregates"):
+        c.execute(
+            f"DELETE FROM {table} WHERE period = 'week' AND period_start < ?", (weekly_cutoff,)
+        )
     conn.commit()
-    conn.close()
 
-    return row
+    logger.info(
+        "Compaction: rolled up and removed %d runs before %s, %d listing spans, "
+        "archived %d payloads.",
+        runs,
+        datetime.utcfromtimestamp(cutoff).isoformat(),
+        spans,
+        archived,
+    )
+    return {"runs": runs, "spans": spans, "archived": archived, "cutoff": cutoff}
 
 
 # -------------------------------------------------
@@ -465,6 +3208,18 @@ def run_count() -> Dict:
 # -------------------------------------------------
 
 
+@app.on_event("startup")
+def warm_driver_pool():
+    # sharded runs launch their own browsers in worker processes
+    if SCRAPE_BACKEND == "selenium" and not SCRAPE_SHARDS:
+        driver_pool.start()
+
+
+@app.on_event("shutdown")
+def close_driver_pool():
+    driver_pool.close()
+
+
 @app.get("/status")
 def status():
     return {"status": "ok"}
@@ -485,6 +3240,8 @@ def debug_run_count():
 
 @app.post("/run")
 def trigger_run(background_tasks: BackgroundTasks):
+    if _run_lock.locked():
+        return JSONResponse({"status": "busy"}, status_code=409)
     logger.info("RUN endpoint received request — starting background task.")
     background_tasks.add_task(debug_run_count)
     return JSONResponse({"status": "started"})
@@ -492,78 +3249,626 @@ def trigger_run(background_tasks: BackgroundTasks):
 
 @app.get("/latest")
 def latest():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT * FROM daily_counts ORDER BY id DESC LIMIT 1")
-    row = c.fetchone()
-    conn.close()
-    if not row:
+    c = get_db().cursor()
+    c.execute(
+        f"""
+        SELECT d.run_at, d.total_active, d.total_pending, d.expected_total, d.harvested_total,
+               a.region, a.village, a.active, a.pending, a.total
+        FROM daily_counts d
+        LEFT JOIN run_aggregates a ON a.run_id = d.id
+        WHERE d.id = (SELECT MAX(id) FROM daily_counts WHERE {COMPLETE_RUN})
+        ORDER BY a.region, a.village
+        """
+    )
+    rows = c.fetchall()
+    if not rows:
         return {}
-    _id, run_at, total_active, total_pending, payload_json = row
+    run_at, total_active, total_pending, expected_total, harvested_total = rows[0][:5]
 
-    listings = json.loads(payload_json)
     grouped: Dict[str, Dict[str, Dict[str, int]]] = {}
-    for r in listings:
-        region = r.get("region") or classify_region(r.get("village", ""))
-        village = r.get("village") or "Unknown"
-        status = r.get("status", "active").lower()
-
-        region_dict = grouped.setdefault(region, {})
-        village_dict = region_dict.setdefault(
-            village, {"active": 0, "pending": 0, "total": 0}
-        )
-
-        if status == "active":
-            village_dict["active"] += 1
-        elif status == "pending":
-            village_dict["pending"] += 1
-        village_dict["total"] += 1
-
-    grouped_sorted: Dict[str, Dict[str, Dict[str, int]]] = {}
-    for region, villages in grouped.items():
-        grouped_sorted[region] = dict(sorted(villages.items(), key=lambda kv: kv[0]))
+    for *_, region, village, active, pending, total in rows:
+        if region is not None:
+            grouped.setdefault(region, {})[village] = {
+                "active": active,
+                "pending": pending,
+                "total": total,
+            }
 
     return {
         "run_at": run_at,
         "total_active": total_active,
         "total_pending": total_pending,
-        "grouped": grouped_sorted,
+        "expected_total": expected_total,
+        "harvested_total": harvested_total,
+        "grouped": grouped,
     }
 
 
-@app.get("/history")
-def history(days: int = 30):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+@app.get("/listings")
+def listings(run_id: Optional[int] = None):
+    """Every listing of one completed run (default: the latest)."""
+    c = get_db().cursor()
+    if run_id is None:
+        c.execute(f"SELECT id, run_at FROM daily_counts WHERE {COMPLETE_RUN} ORDER BY id DESC LIMIT 1")
+    else:
+        c.execute(f"SELECT id, run_at FROM daily_counts WHERE id = ? AND {COMPLETE_RUN}", (run_id,))
+    row = c.fetchone()
+    if not row:
+        return {}
+    data = [
+        {"id": r[0], "status": r[1], "type": r[2], "village": r[3], "region": r[4]}
+        for r in listings_at_run(c, row[0])
+    ]
+    return {"run_id": row[0], "run_at": row[1], "listings": data}
+
+
+def _epoch(value: str, end: bool = False) -> int:
+    """UTC epoch seconds of an ISO date/datetime; a bare end date covers that whole day."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Not an ISO date/datetime: {value!r}")
+    if end and len(value) == 10:
+        dt += timedelta(days=1)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def run_range(days: int, start: Optional[str], end: Optional[str]):
+    """[lo, hi) epoch bounds: start/end if given, else the last `days` days."""
+    hi = _epoch(end, end=True) if end else int(time.time()) + 1
+    lo = _epoch(start) if start else hi - days * 86400
+    return lo, hi
+
+
+def query_runs(c, columns: str, lo: int, hi: int, per_day: bool = False):
+    """
+    Completed runs with lo <= run_at_epoch < hi, newest first, via the
+    run_at_epoch index. per_day keeps only the last run of each UTC day.
+    """
+    where = f"{COMPLETE_RUN} AND run_at_epoch >= ? AND run_at_epoch < ?"
+    if per_day:
+        return c.execute(
+            f"""
+            SELECT {columns} FROM (
+                SELECT *, ROW_NUMBER() OVER (
+                    PARTITION BY run_at_epoch / 86400 ORDER BY run_at_epoch DESC, id DESC
+                ) AS nth
+                FROM daily_counts WHERE {where}
+            )
+            WHERE nth = 1 ORDER BY run_at_epoch DESC
+            """,
+            (lo, hi),
+        )
+    return c.execute(
+        f"SELECT {columns} FROM daily_counts WHERE {where} ORDER BY run_at_epoch DESC, id DESC",
+        (lo, hi),
+    )
+
+
+def pick_granularity(c, lo: int, hi: int) -> str:
+    """
+    "month" if the range reaches back past the weekly rollups into
+    months that have been compacted, "week" if it overlaps compacted
+    weeks, else "run".
+    """
+    has_rollup = (
+        "SELECT 1 FROM rollup_counts WHERE period = ? AND period_start < ? "
+        "AND period_start >= ? LIMIT 1"
+    )
+    weekly_cutoff = time.time() - ROLLUP_WEEKLY_DAYS * 86400
+    if lo < weekly_cutoff and c.execute(
+        has_rollup, ("month", hi, period_start(lo, "month"))
+    ).fetchone():
+        return "month"
+    if c.execute(has_rollup, ("week", hi, period_start(lo, "week"))).fetchone():
+        return "week"
+    return "run"
+
+
+def history_rows(c, lo: int, hi: int, granularity: str = "auto", per_day: bool = False):
+    """
+    (granularity, rows) for [lo, hi), newest first; rows is a lazy
+    iterator over the cursor c, so read it before reusing c. Rows are
+    (run_at, active, pending, expected, harvested, runs); for weeks and
+    months run_at is the period start and the counts are averages over
+    its runs, combining rollups of compacted runs with runs still kept
+    in full.
+    """
+    if granularity == "auto":
+        granularity = pick_granularity(c, lo, hi)
+    if granularity == "run":
+        rows = query_runs(
+            c,
+            "run_at, total_active, total_pending, expected_total, harvested_total, 1",
+            lo,
+            hi,
+            per_day,
+        )
+        return granularity, rows
+    if granularity not in _PERIOD_SQL:
+        raise HTTPException(status_code=400, detail=f"Unknown granularity: {granularity!r}")
+
     c.execute(
-        "SELECT run_at, total_active, total_pending "
-        "FROM daily_counts ORDER BY id DESC LIMIT ?",
-        (days,),
+        f"""
+        SELECT period_start, SUM(runs), SUM(active_sum), SUM(pending_sum), SUM(harvested_sum)
+        FROM (
+            SELECT period_start, runs, active_sum, pending_sum, harvested_sum
+            FROM rollup_counts
+            WHERE period = ? AND period_start >= ? AND period_start < ?
+            UNION ALL
+            SELECT {_PERIOD_SQL[granularity].format(col="run_at_epoch")}, COUNT(*),
+                   SUM(total_active), SUM(total_pending),
+                   SUM(COALESCE(harvested_total, total_active + total_pending))
+            FROM daily_counts
+            WHERE {COMPLETE_RUN} AND run_at_epoch >= ? AND run_at_epoch < ?
+            GROUP BY 1
+        )
+        GROUP BY period_start ORDER BY period_start DESC
+        """,
+        (granularity, period_start(lo, granularity), hi, lo, hi),
     )
-    rows = c.fetchall()
-    conn.close()
-    data = [{"run_at": r[0], "active": r[1], "pending": r[2]} for r in rows]
-    return {"data": data}
+    rows = (
+        (
+            datetime.utcfromtimestamp(start).isoformat(),
+            round(active / runs),
+            round(pending / runs),
+            None,
+            round(harvested / runs),
+            runs,
+        )
+        for start, runs, active, pending, harvested in c
+    )
+    return granularity, rows
+
+
+@app.get("/history")
+def history(
+    days: int = 30,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    per_day: bool = False,
+    granularity: str = "auto",
+):
+    c = get_db().cursor()
+    lo, hi = run_range(days, start, end)
+    granularity, rows = history_rows(c, lo, hi, granularity, per_day)
+    data = []
+    for r in rows:
+        item = {
+            "run_at": r[0],
+            "active": r[1],
+            "pending": r[2],
+            "expected": r[3],
+            "harvested": r[4],
+        }
+        if granularity != "run":
+            item["runs"] = r[5]
+        data.append(item)
+    return {"granularity": granularity, "data": data}
 
 
 @app.get("/export.csv")
-def export_csv(days: int = 365):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        "SELECT run_at, total_active, total_pending "
-        "FROM daily_counts ORDER BY id DESC LIMIT ?",
-        (days,),
+def export_csv(
+    level: str = "run",
+    days: int = 365,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    per_day: bool = False,
+    granularity: str = "auto",
+):
+    """
+    level=run streams the /history rows (per_day applies); region, village
+    and listing stream the same rows as the columnar exports. granularity
+    works as there for all levels.
+    """
+    lo, hi = run_range(days, start, end)
+    c = get_db().cursor()
+    if level == "run":
+        if granularity == "auto":
+            granularity = pick_granularity(c, lo, hi)
+        elif granularity != "run" and granularity not in _PERIOD_SQL:
+            raise HTTPException(status_code=400, detail=f"Unknown granularity: {granularity!r}")
+    else:
+        granularity = export_granularity(c, level, granularity, lo, hi)
+    return StreamingResponse(
+        iter_csv_export(level, lo, hi, per_day, granularity),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="villages-{level}.csv"',
+            "X-Granularity": granularity,
+        },
     )
-    rows = c.fetchall()
-    conn.close()
 
-    def iter_csv():
-        yield "run_at,total_active,total_pending\n"
-        for r in rows:
-            yield f"{r[0]},{r[1]},{r[2]}\n"
 
-    return StreamingResponse(iter_csv(), media_type="text/csv")
+def iter_csv_export(
+    level: str, lo: int, hi: int, per_day: bool = False, granularity: str = "run"
+) -> Iterator[str]:
+    """
+    CSV text EXPORT_BATCH_ROWS rows at a time, read from a live cursor and
+    written through one reused buffer, so memory doesn't grow with the range.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    conn = open_stream_db()
+    try:
+        c = conn.cursor()
+        if level == "run":
+            writer.writerow(["run_at", "total_active", "total_pending"])
+            _, rows = history_rows(c, lo, hi, granularity, per_day)
+            rows = (r[:3] for r in rows)
+        else:
+            columns, rows = export_rows(
+                c,
+                level,
+                granularity,
+                lo,
+                hi,
+                run_at="d.run_at",
+                period_at="strftime('%Y-%m-%dT%H:%M:%S', ps, 'unixepoch')",
+            )
+            writer.writerow([name for name, _ in columns])
+        while True:
+            batch = list(islice(rows, EXPORT_BATCH_ROWS))
+            if not batch:
+                break
+            writer.writerows(batch)
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():  # header only
+            yield buf.getvalue()
+    finally:
+        conn.close()
+
+
+# Exports: level -> (columns with Arrow types, query over [:lo, :hi)).
+# {run_at} is the run time column: epoch ms for Arrow, the ISO text for CSV.
+# Runs older than RETAIN_DETAIL_DAYS are only left in the rollups, which
+# EXPORT_PERIOD_LEVELS reads.
+EXPORT_LEVELS = {
+    "run": (
+        [
+            ("run_id", "int64"),
+            ("run_at", "timestamp"),
+            ("total_active", "int32"),
+            ("total_pending", "int32"),
+            ("expected_total", "int32"),
+            ("harvested_total", "int32"),
+        ],
+        f"""
+        SELECT d.id, {{run_at}}, d.total_active, d.total_pending,
+               d.expected_total, d.harvested_total
+        FROM daily_counts d
+        WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+        ORDER BY d.run_at_epoch, d.id
+        """,
+    ),
+    "region": (
+        [
+            ("run_id", "int64"),
+            ("run_at", "timestamp"),
+            ("region", "string"),
+            ("active", "int32"),
+            ("pending", "int32"),
+            ("total", "int32"),
+        ],
+        f"""
+        SELECT d.id, {{run_at}}, a.region, SUM(a.active), SUM(a.pending), SUM(a.total)
+        FROM daily_counts d JOIN run_aggregates a ON a.run_id = d.id
+        WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+        GROUP BY d.id, a.region
+        ORDER BY d.run_at_epoch, d.id, a.region
+        """,
+    ),
+    "village": (
+        [
+            ("run_id", "int64"),
+            ("run_at", "timestamp"),
+            ("region", "string"),
+            ("village", "string"),
+            ("active", "int32"),
+            ("pending", "int32"),
+            ("total", "int32"),
+        ],
+        f"""
+        SELECT d.id, {{run_at}}, a.region, a.village, a.active, a.pending, a.total
+        FROM daily_counts d JOIN run_aggregates a ON a.run_id = d.id
+        WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+        ORDER BY d.run_at_epoch, d.id, a.region, a.village
+        """,
+    ),
+    "listing": (
+        [
+            ("run_id", "int64"),
+            ("run_at", "timestamp"),
+            ("listing_id", "string"),
+            ("status", "string"),
+            ("type", "string"),
+            ("village", "string"),
+            ("region", "string"),
+        ],
+        # The runs in range; export_rows() adds each one's listings_at_run()
+        # rather than sorting one span join over the whole range
+        f"""
+        SELECT d.id, {{run_at}} FROM daily_counts d
+        WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+        ORDER BY d.run_at_epoch, d.id
+        """,
+    ),
+}
+
+
+# Completed runs per week / month ({bucket}) in [:lo, :hi), rolled up or not
+_EXPORT_PERIOD_RUNS = f"""
+WITH runs(run_ps, n) AS (
+    SELECT period_start, SUM(runs) FROM (
+        SELECT period_start, runs FROM rollup_counts
+        WHERE period = :period AND period_start >= :plo AND period_start < :hi
+        UNION ALL
+        SELECT {{bucket}}, COUNT(*) FROM daily_counts d
+        WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+        GROUP BY 1
+    )
+    GROUP BY 1
+)
+"""
+
+# Same levels per week / month: rollups of compacted runs plus the runs
+# still kept, summed ({period_at} is the period start; divide by runs for
+# the average run). There are no listing rollups.
+EXPORT_PERIOD_LEVELS = {
+    "run": (
+        [
+            ("period_start", "timestamp"),
+            ("runs", "int32"),
+            ("active_sum", "int64"),
+            ("pending_sum", "int64"),
+            ("harvested_sum", "int64"),
+        ],
+        f"""
+        SELECT {{period_at}}, SUM(runs), SUM(a), SUM(p), SUM(h) FROM (
+            SELECT period_start AS ps, runs, active_sum AS a, pending_sum AS p,
+                   harvested_sum AS h
+            FROM rollup_counts
+            WHERE period = :period AND period_start >= :plo AND period_start < :hi
+            UNION ALL
+            SELECT {{bucket}}, COUNT(*), SUM(d.total_active), SUM(d.total_pending),
+                   SUM(COALESCE(d.harvested_total, d.total_active + d.total_pending))
+            FROM daily_counts d
+            WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+            GROUP BY 1
+        )
+        GROUP BY ps
+        ORDER BY ps
+        """,
+    ),
+    "region": (
+        [
+            ("period_start", "timestamp"),
+            ("runs", "int32"),
+            ("region", "string"),
+            ("active_sum", "int64"),
+            ("pending_sum", "int64"),
+            ("total_sum", "int64"),
+        ],
+        _EXPORT_PERIOD_RUNS
+        + f"""
+        SELECT {{period_at}}, r.n, g.region, g.a, g.p, g.t FROM (
+            SELECT ps, region, SUM(a) AS a, SUM(p) AS p, SUM(t) AS t FROM (
+                SELECT period_start AS ps, region, active_sum AS a, pending_sum AS p,
+                       total_sum AS t
+                FROM rollup_aggregates
+                WHERE period = :period AND period_start >= :plo AND period_start < :hi
+                UNION ALL
+                SELECT {{bucket}}, a.region, SUM(a.active), SUM(a.pending), SUM(a.total)
+                FROM daily_counts d JOIN run_aggregates a ON a.run_id = d.id
+                WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+                GROUP BY 1, 2
+            )
+            GROUP BY ps, region
+        ) g JOIN runs r ON r.run_ps = g.ps
+        ORDER BY g.ps, g.region
+        """,
+    ),
+    "village": (
+        [
+            ("period_start", "timestamp"),
+            ("runs", "int32"),
+            ("region", "string"),
+            ("village", "string"),
+            ("active_sum", "int64"),
+            ("pending_sum", "int64"),
+            ("total_sum", "int64"),
+        ],
+        _EXPORT_PERIOD_RUNS
+        + f"""
+        SELECT {{period_at}}, r.n, g.region, g.village, g.a, g.p, g.t FROM (
+            SELECT ps, region, village, SUM(a) AS a, SUM(p) AS p, SUM(t) AS t FROM (
+                SELECT period_start AS ps, region, village, active_sum AS a,
+                       pending_sum AS p, total_sum AS t
+                FROM rollup_aggregates
+                WHERE period = :period AND period_start >= :plo AND period_start < :hi
+                UNION ALL
+                SELECT {{bucket}}, a.region, a.village,
+                       SUM(a.active), SUM(a.pending), SUM(a.total)
+                FROM daily_counts d JOIN run_aggregates a ON a.run_id = d.id
+                WHERE {COMPLETE_RUN} AND d.run_at_epoch >= :lo AND d.run_at_epoch < :hi
+                GROUP BY 1, 2, 3
+            )
+            GROUP BY ps, region, village
+        ) g JOIN runs r ON r.run_ps = g.ps
+        ORDER BY g.ps, g.region, g.village
+        """,
+    ),
+}
+
+
+def export_granularity(c, level: str, granularity: str, lo: int, hi: int) -> str:
+    """
+    What an export of level answers with. auto follows pick_granularity()
+    as /history does, except for listings, which are only kept per run.
+    """
+    if level not in EXPORT_LEVELS:
+        raise HTTPException(status_code=400, detail=f"Unknown level: {level!r}")
+    if granularity == "auto":
+        return "run" if level == "listing" else pick_granularity(c, lo, hi)
+    if granularity != "run" and granularity not in _PERIOD_SQL:
+        raise HTTPException(status_code=400, detail=f"Unknown granularity: {granularity!r}")
+    if granularity != "run" and level not in EXPORT_PERIOD_LEVELS:
+        raise HTTPException(
+            status_code=400, detail=f"The {level} level has no {granularity}ly rollups"
+        )
+    return granularity
+
+
+def export_query(level: str, granularity: str, lo: int, hi: int, run_at: str, period_at: str):
+    """(columns, sql, params) for one export level at a resolved granularity."""
+    params = {"lo": lo, "hi": hi, "period": granularity, "plo": lo}
+    if granularity == "run":
+        columns, sql = EXPORT_LEVELS[level]
+    else:
+        columns, sql = EXPORT_PERIOD_LEVELS[level]
+        params["plo"] = period_start(lo, granularity)
+    bucket = _PERIOD_SQL.get(granularity, "").format(col="d.run_at_epoch")
+    return columns, sql.format(run_at=run_at, period_at=period_at, bucket=bucket), params
+
+
+def export_rows(c, level: str, granularity: str, lo: int, hi: int, run_at: str, period_at: str):
+    """(columns, rows) for one export level, rows streamed from c's connection."""
+    columns, sql, params = export_query(level, granularity, lo, hi, run_at, period_at)
+    rows = c.execute(sql, params)
+    if level == "listing":
+        rows = _with_run_listings(c.connection.cursor(), rows.fetchall())
+    return columns, rows
+
+
+def _with_run_listings(c, runs):
+    for run in runs:
+        for listing in listings_at_run(c, run[0]):
+            yield run + listing
+
+
+class _ByteSink:
+    """Write-only file object that hands back what was written since the last take()."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _export_schema(columns):
+    types = {
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "string": pa.string(),
+        # Parquet has no second-resolution timestamps, so both formats use ms
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def iter_columnar_export(
+    fmt: str, level: str, lo: int, hi: int, granularity: str = "run"
+) -> Iterator[bytes]:
+    """
+    Stream one export level as Parquet (a row group per batch) or an Arrow
+    IPC stream, EXPORT_BATCH_ROWS rows at a time from a live cursor.
+    """
+    sink = _ByteSink()
+    conn = open_stream_db()
+    try:
+        columns, source = export_rows(
+            conn.cursor(),
+            level,
+            granularity,
+            lo,
+            hi,
+            run_at="d.run_at_epoch * 1000",
+            period_at="ps * 1000",
+        )
+        schema = _export_schema(columns)
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        while True:
+            rows = list(islice(source, EXPORT_BATCH_ROWS))
+            if not rows:
+                break
+            arrays = [
+                pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.take()
+        writer.close()
+        yield sink.take()
+    finally:
+        conn.close()
+
+
+def _columnar_response(fmt: str, level: str, days: int, start, end, granularity: str):
+    if pa is None:
+        raise HTTPException(status_code=501, detail="Columnar exports need pyarrow installed")
+    lo, hi = run_range(days, start, end)
+    granularity = export_granularity(get_db().cursor(), level, granularity, lo, hi)
+    media_type = {
+        "parquet": "application/vnd.apache.parquet",
+        "arrow": "application/vnd.apache.arrow.stream",
+    }[fmt]
+    return StreamingResponse(
+        iter_columnar_export(fmt, level, lo, hi, granularity),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="villages-{level}.{fmt}"',
+            "X-Granularity": granularity,
+        },
+    )
+
+
+@app.get("/export.parquet")
+def export_parquet(
+    level: str = "run",
+    days: int = 365,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    granularity: str = "auto",
+):
+    return _columnar_response("parquet", level, days, start, end, granularity)
+
+
+@app.get("/export.arrow")
+def export_arrow(
+    level: str = "run",
+    days: int = 365,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    granularity: str = "auto",
+):
+    return _columnar_response("arrow", level, days, start, end, granularity)
 
 
 # -------------------------------------------------
@@ -572,7 +3877,10 @@ def export_csv(days: int = 365):
 
 scheduler = BackgroundScheduler()
 scheduler.add_job(run_count, "cron", hour=6, minute=0)
-scheduler.start()
+scheduler.add_job(compact_history, "cron", hour=6, minute=30)
+# shard worker processes import this module too; only the parent schedules
+if not IS_SHARD_WORKER:
+    scheduler.start()
 
 if __name__ == "__main__":
     import uvicorn
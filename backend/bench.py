@@ -0,0 +1,493 @@
+"""
+Offline benchmarks for the scraper and storage paths.
+
+Run against the local fixture server, e.g.:
+    python fixture_server.py --port 8765 &
+    python bench.py backends --base http://127.0.0.1:8765 --runs 3
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault("DB_PATH", ":memory:")
+
+import app  # noqa: E402
+from fixture_server import synthetic_records  # noqa: E402
+
+app.scheduler.shutdown(wait=False)
+
+
+def _timed(fn, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, timings
+
+
+def _report(label: str, result, timings):
+    print(
+        f"{label:<20} listings={len(result):>6}  "
+        f"median={statistics.median(timings):8.3f}s  "
+        f"min={min(timings):8.3f}s  max={max(timings):8.3f}s"
+    )
+
+
+def bench_backends(args):
+    app.HOMEFINDER_URL = args.base.rstrip("/") + "/homefinder/"
+    app.HOMEFINDER_FEED_URL = args.base.rstrip("/") + "/feed"
+
+    configs = [("http", None), ("selenium", "network"), ("selenium", "scroll")]
+    for backend, engine in configs:
+        if args.only and backend != args.only:
+            continue
+        app.SCRAPE_BACKEND = backend
+        if engine:
+            app.SCRAPE_ENGINE = engine
+        label = backend if not engine else f"{backend}/{engine}"
+        try:
+            result, timings = _timed(app.scrape_listings, args.runs)
+        except Exception as e:
+            print(f"{label:<20} failed: {e}")
+            continue
+        _report(label, result, timings)
+
+
+def bench_resources(args):
+    if args.base:
+        app.HOMEFINDER_URL = args.base.rstrip("/") + "/homefinder/"
+    app.SCRAPE_BACKEND = "selenium"
+
+    for blocking in (True, False):
+        app.BLOCK_RESOURCES = blocking
+        ready, load_kb, total_kb = [], [], []
+        for _ in range(args.runs):
+            stats = {}
+            app.scrape_listings(stats)
+            ready.append(stats.get("page_ready_seconds", 0.0))
+            load_kb.append(stats.get("page_load_bytes", 0) / 1024.0)
+            total_kb.append(stats.get("bytes_transferred", 0) / 1024.0)
+        print(
+            f"blocking={'on ' if blocking else 'off'}  "
+            f"page_ready={statistics.median(ready):6.2f}s  "
+            f"page_load={statistics.median(load_kb):9.0f} KB  "
+            f"whole_run={statistics.median(total_kb):9.0f} KB"
+        )
+
+
+def _card_lines(rec):
+    prefix = "VNH# " if rec["listingNumber"].startswith("VNH") else "VLS# "
+    return [
+        rec["price"],
+        rec["address"],
+        f"The Village of {rec['villageName']}",
+        prefix + rec["listingNumber"][3:],
+        rec["status"],
+    ]
+
+
+def _card_html(rec):
+    """
+    A card as AngularJS renders it: ng-* comments all through it and the
+    other status badge present but hidden with ng-hide, neither of which
+    shows up in innerText (the recorded card text).
+    """
+    lines = _card_lines(rec)
+    other = "Active" if rec["status"] == "Pending" else "Pending"
+    return (
+        f'<md-card class="propertyCard" data-lat="{rec["latitude"]}" '
+        f'data-lng="{rec["longitude"]}"><!-- ngRepeat: card in vm.cards -->'
+        + "".join(f"<div>{line}</div>" for line in lines[:-1])
+        + f"<!-- ngIf: card.{other.lower()} -->"
+        + f'<div class="badge ng-hide"><span>{other}</span><br>Under Contract</div>'
+        + f"<div><!-- ngIf: card.{rec['status'].lower()} -->{lines[-1]}<!-- end ngIf --></div>"
+        + "</md-card>"
+    )
+
+
+def make_archive(path: str, n: int, per_loop: int = 12):
+    """Write a synthetic card recording shaped like a scroll-engine run."""
+    records = synthetic_records(n)
+    recorder = app.Recorder(path, "selenium", "synthetic")
+    for start in range(0, len(records), per_loop):
+        chunk = records[start : start + per_loop]
+        cards = [
+            {
+                "text": "\n".join(_card_lines(rec)),
+                "attrs": {"lat": str(rec["latitude"]), "lng": str(rec["longitude"])},
+            }
+            for rec in chunk
+        ]
+        html = "<md-content>" + "".join(_card_html(rec) for rec in chunk) + "</md-content>"
+        recorder.cards(cards, html)
+    recorder.close({"expected_total": len(records)})
+
+
+def bench_make_archive(args):
+    make_archive(args.out, args.synthetic)
+    print(f"Wrote {args.synthetic} synthetic cards to {args.out}")
+
+
+def bench_replay(args):
+    app.SCRAPE_BACKEND = "replay"
+    app.SCRAPE_REPLAY_PATH = args.archive
+    with tempfile.TemporaryDirectory() as tmp:
+        app.DB_PATH = os.path.join(tmp, "bench.db")
+        app.init_db()
+
+        result, timings = _timed(app.scrape_listings, args.runs)
+        _report("parse only", result, timings)
+        print(f"{'':<20} {60.0 / statistics.median(timings):,.0f} runs/minute")
+
+        result, timings = _timed(app.run_count, args.runs)
+        print(
+            f"{'parse + run_count':<20} listings={result['harvested_total']:>6}  "
+            f"median={statistics.median(timings):8.3f}s  "
+            f"{60.0 / statistics.median(timings):,.0f} runs/minute"
+        )
+
+
+def _legacy_parse_card_text(full_text: str):
+    """parse_card_text as it was before the single-pass rewrite (baseline)."""
+    full_text = full_text or ""
+    lower = full_text.lower()
+
+    uid = ""
+    list_type = ""
+    for line in full_text.splitlines():
+        upper_line = line.strip().upper()
+        if upper_line.startswith("VNH#") or upper_line.startswith("VLS#"):
+            prefix = upper_line[:3]
+            tail = "".join(ch for ch in upper_line[4:] if ch.isalnum())
+            uid = f"{prefix}{tail}" if tail else ""
+            list_type = "new" if prefix == "VNH" else "preowned"
+            break
+    if not uid:
+        uid = full_text[:40]
+
+    village = ""
+    for line in full_text.splitlines():
+        if "village of" in line.lower():
+            village = line.strip()
+            break
+
+    status = "active"
+    if "pending" in lower or "under contract" in lower:
+        status = "pending"
+
+    if not list_type:
+        list_type = "preowned"
+        if "new home" in lower or "model" in lower:
+            list_type = "new"
+
+    return {
+        "id": uid,
+        "title": full_text[:120],
+        "status": status,
+        "type": list_type,
+        "village": village,
+        "region": app.classify_region(village),
+    }
+
+
+def parse_corpus(n: int):
+    """Synthetic card texts, with a few ID-less and 'Under Contract' variants."""
+    texts = []
+    for i, rec in enumerate(synthetic_records(n)):
+        lines = _card_lines(rec)
+        if i % 17 == 0:
+            lines[-1] = "Under Contract"
+        if i % 29 == 0:
+            lines = [line for line in lines if "#" not in line] + ["Model Home"]
+        texts.append("\n".join(["3 Bed | 2 Bath | 1,850 Sq Ft"] + lines))
+    return texts
+
+
+def bench_parse(args):
+    texts = parse_corpus(args.cards)
+    parsers = [("before", _legacy_parse_card_text), ("after", app.parse_card_text)]
+
+    outputs = {}
+    for name, fn in parsers:
+        result, timings = _timed(lambda: [fn(t) for t in texts], args.runs)
+        outputs[name] = result
+        per_card = statistics.median(timings) / len(texts) * 1e6
+        print(
+            f"{name:<8} cards={len(texts):>7}  "
+            f"median={statistics.median(timings):7.3f}s  {per_card:6.2f} us/card"
+        )
+
+    mismatches = sum(
+        a != {k: getattr(b, k) for k in a} for a, b in zip(outputs["before"], outputs["after"])
+    )
+    print(f"{'':<8} mismatched_cards={mismatches}")
+
+
+def bench_listing(args):
+    texts = parse_corpus(args.listings)
+    listings = [app.parse_card_text(t) for t in texts]
+    rows = [listing.to_row() for listing in listings]
+
+    def build_dicts():
+        # per-listing dicts as json.loads() rebuilds them, no shared strings
+        return [json.loads(json.dumps(listing.as_dict())) for listing in listings]
+
+    def build_listings():
+        return [app.Listing.from_row(json.loads(json.dumps(row))) for row in rows]
+
+    def group_dicts(records):
+        grouped = {}
+        for r in records:
+            region = r.get("region") or app.classify_region(r.get("village", ""))
+            village = r.get("village") or "Unknown"
+            status = (r.get("status") or "active").lower()
+            counts = grouped.setdefault(region, {}).setdefault(
+                village, {"active": 0, "pending": 0, "total": 0}
+            )
+            if status in ("active", "pending"):
+                counts[status] += 1
+            counts["total"] += 1
+        return grouped
+
+    def group_listings(records):
+        grouped = {}
+        for r in records:
+            app.add_to_grouped(grouped, r)
+        return grouped
+
+    for name, build, group in (
+        ("dict", build_dicts, group_dicts),
+        ("Listing", build_listings, group_listings),
+    ):
+        tracemalloc.start()
+        records = build()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result, timings = _timed(lambda: group(records), args.runs)
+        print(
+            f"{name:<8} listings={len(records):>7}  {size / len(records):7.0f} B/listing  "
+            f"grouping median={statistics.median(timings) * 1000:8.2f}ms"
+        )
+        del records
+
+
+def bench_payload(args):
+    base = [app.parse_card_text(t) for t in parse_corpus(args.listings)]
+    legacy_keys = ("id", "title", "status", "type", "village", "region")
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for fmt in ("json", "blob"):
+            path = os.path.join(tmp, f"{fmt}.db")
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, payload)")
+            started = time.perf_counter()
+            for day in range(args.days):
+                # a few listings turn over each day, like the real inventory
+                listings = base[day % 50 :] + base[: day % 50]
+                if fmt == "json":
+                    # the pre-listing_snapshots payload_json format
+                    payload = json.dumps([{k: getattr(r, k) for k in legacy_keys} for r in listings])
+                else:
+                    payload = app.encode_payload(listings)
+                conn.execute("INSERT INTO runs(payload) VALUES (?)", (payload,))
+            conn.commit()
+            write = time.perf_counter() - started
+            payloads = [r[0] for r in conn.execute("SELECT payload FROM runs")]
+            conn.close()
+            sizes[fmt] = os.path.getsize(path)
+
+            _, full = _timed(lambda: [app.decode_payload(p) for p in payloads], args.runs)
+            _, cols = _timed(
+                lambda: [app.decode_payload(p, ("status", "village")) for p in payloads], args.runs
+            )
+            print(
+                f"{fmt:<5} days={args.days}  db={sizes[fmt] / 1e6:8.1f} MB  write={write:6.2f}s  "
+                f"decode all={statistics.median(full) / args.days * 1000:7.2f}ms/run  "
+                f"status+village={statistics.median(cols) / args.days * 1000:7.2f}ms/run"
+            )
+    print(f"{'':<5} blob / json size = {sizes['blob'] / sizes['json']:.3f}")
+
+
+def synthetic_boundaries(vertices: int = 200):
+    """Region bands stacked north to south, each a ring with many vertices."""
+    regions = list(app.REGION_DEFS)
+    north, south = app.VILLAGES_LAT + 0.15, app.VILLAGES_LAT - 0.15
+    west, east = app.VILLAGES_LNG - 0.1, app.VILLAGES_LNG + 0.1
+    step = (north - south) / len(regions)
+    features = []
+    for i, region in enumerate(regions):
+        top, bottom = north - i * step, north - (i + 1) * step
+        n = vertices // 2
+        edge = [west + (east - west) * k / (n - 1) for k in range(n)]
+        ring = [[x, top] for x in edge] + [[x, bottom] for x in reversed(edge)]
+        ring.append(ring[0])
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {app.REGION_BOUNDARIES_PROPERTY: region},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            }
+        )
+    return features
+
+
+def bench_geo(args):
+    features = synthetic_boundaries(args.vertices)
+    started = time.perf_counter()
+    index = app.RegionIndex(features, app.REGION_GRID_SIZE)
+    print(f"index build      {time.perf_counter() - started:8.4f}s  polygons={len(index.polygons)}")
+
+    points = [(r["latitude"], r["longitude"]) for r in synthetic_records(args.points)]
+    result, timings = _timed(lambda: [index.lookup(lat, lng) for lat, lng in points], args.runs)
+    unknown = sum(r is None for r in result)
+    print(
+        f"lookup           points={len(points):>6}  "
+        f"median={statistics.median(timings) * 1000:8.2f}ms  unmatched={unknown}"
+    )
+
+
+def _percentile(values, pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100.0))]
+
+
+def bench_latency(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "run.jsonl.gz")
+        make_archive(archive, args.listings)
+        app.SCRAPE_BACKEND = "replay"
+        app.SCRAPE_REPLAY_PATH = archive
+
+        # (journal mode, keep one connection per thread)
+        for mode, pooled in (("delete", False), ("wal", True)):
+            app.SQLITE_JOURNAL_MODE = mode
+            app.DB_PATH = os.path.join(tmp, f"{mode}.db")
+            app.init_db()
+            app.RUN_BATCH_SIZE = 1000
+            for _ in range(args.history):
+                app.run_count()
+
+            # write-heavy scrape: a commit every few listings
+            app.RUN_BATCH_SIZE = args.batch
+            done = threading.Event()
+
+            def writer():
+                try:
+                    for _ in range(args.scrapes):
+                        app.run_count()
+                finally:
+                    done.set()
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            timings = {"latest": [], "history": []}
+            while not done.is_set():
+                for name, endpoint in (("latest", app.latest), ("history", app.history)):
+                    if not pooled:
+                        app.get_db().close()
+                        app._db_local.__dict__.clear()
+                    started = time.perf_counter()
+                    endpoint()
+                    timings[name].append((time.perf_counter() - started) * 1000)
+            thread.join()
+
+            label = f"{mode}{'' if pooled else ', new conn per call'}"
+            for name, values in timings.items():
+                print(
+                    f"{label:<28} {name:<8} calls={len(values):>6}  "
+                    f"p50={_percentile(values, 50):7.2f}ms  p99={_percentile(values, 99):7.2f}ms"
+                )
+
+
+def bench_parity(args):
+    loops = [r for r in app.iter_recording(args.archive) if "cards" in r]
+    expected = [[app.parse_card_text(c["text"]) for c in r["cards"]] for r in loops]
+
+    parsers = [("stdlib", None)]
+    if app.lxml_html is not None:
+        parsers.insert(0, ("lxml", app.lxml_html))
+
+    for name, module in parsers:
+        app.lxml_html = module
+        mismatches = 0
+        started = time.perf_counter()
+        for record, want in zip(loops, expected):
+            got = [app.parse_card_text(c["text"]) for c in app.extract_cards_html(record["html"])]
+            if got != want:
+                mismatches += 1
+        elapsed = time.perf_counter() - started
+        print(
+            f"html/{name:<8} loops={len(loops):>5}  mismatched_loops={mismatches:>4}  "
+            f"{elapsed:8.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Villages tracker benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("backends", help="scrape_listings() per backend/engine")
+    p.add_argument("--base", default="http://127.0.0.1:8765")
+    p.add_argument("--runs", type=int, default=3)
+    p.add_argument("--only", choices=["http", "selenium"])
+    p.set_defaults(func=bench_backends)
+
+    p = sub.add_parser("resources", help="page load with and without resource blocking")
+    p.add_argument("--base", help="fixture server; default is the live Homefinder URL")
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_resources)
+
+    p = sub.add_parser("make-archive", help="write a synthetic card recording")
+    p.add_argument("--out", default="synthetic.jsonl.gz")
+    p.add_argument("--synthetic", type=int, default=2500)
+    p.set_defaults(func=bench_make_archive)
+
+    p = sub.add_parser("replay", help="parse + aggregate a recording with no browser")
+    p.add_argument("archive")
+    p.add_argument("--runs", type=int, default=20)
+    p.set_defaults(func=bench_replay)
+
+    p = sub.add_parser("parse", help="parse_card_text() before/after on synthetic cards")
+    p.add_argument("--cards", type=int, default=100000)
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("listing", help="memory and grouping cost, dicts vs Listing")
+    p.add_argument("--listings", type=int, default=100000)
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_listing)
+
+    p = sub.add_parser("payload", help="payload_json vs encode_payload() over a year of runs")
+    p.add_argument("--days", type=int, default=365)
+    p.add_argument("--listings", type=int, default=2500)
+    p.add_argument("--runs", type=int, default=1)
+    p.set_defaults(func=bench_payload)
+
+    p = sub.add_parser("geo", help="RegionIndex point lookups on synthetic boundaries")
+    p.add_argument("--points", type=int, default=50000)
+    p.add_argument("--vertices", type=int, default=200)
+    p.add_argument("--runs", type=int, default=3)
+    p.set_defaults(func=bench_geo)
+
+    p = sub.add_parser("latency", help="/latest and /history latency during a scrape")
+    p.add_argument("--listings", type=int, default=2500)
+    p.add_argument("--history", type=int, default=30)
+    p.add_argument("--scrapes", type=int, default=3)
+    p.add_argument("--batch", type=int, default=5)
+    p.set_defaults(func=bench_latency)
+
+    p = sub.add_parser("parity", help="HTML parser output vs recorded card texts")
+    p.add_argument("archive")
+    p.set_defaults(func=bench_parity)
+
+    args = parser.parse_args()
+    args.func(args)
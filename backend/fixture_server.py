@@ -0,0 +1,168 @@
+"""
+Local stand-in for Homefinder, for offline runs and benchmarks.
+
+Serves recorded (or synthetic) listing records two ways:
+  /feed        JSON listing feed, paged with ?page=&pageSize=
+  /homefinder/ minimal SPA page that loads /feed over XHR and renders
+               md-content > md-card.propertyCard elements
+
+Run:
+    python fixture_server.py --port 8765 --feed recorded_feed.json
+    python fixture_server.py --port 8765 --synthetic 2500
+
+Then point the scraper at it:
+    HOMEFINDER_URL=http://127.0.0.1:8765/homefinder/
+    HOMEFINDER_FEED_URL=http://127.0.0.1:8765/feed
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+SAMPLE_VILLAGES = [
+    "Fenney",
+    "DeLuna",
+    "Marsh Bend",
+    "St. Catherine",
+    "Hawkins",
+    "Sanibel",
+    "Pinellas",
+    "Hadley",
+    "Bonnybrook",
+    "Spanish Springs",
+    "Eastport",
+    "Newell",
+]
+
+PAGE_HTML = """<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8"><title>Homefinder fixture</title></head>
+<body>
+<div class="results-count"><span id="resultCount"></span> Homes</div>
+<md-content style="display:block;height:800px;overflow:auto">
+  <md-virtual-repeat-container>
+    <div class="md-virtual-repeat-offsetter" id="cards"></div>
+  </md-virtual-repeat-container>
+</md-content>
+<script>
+  var PAGE_SIZE = %(page_size)d;
+  function render(rec) {
+    var card = document.createElement("md-card");
+    card.className = "propertyCard";
+    card.style.display = "block";
+    card.style.height = "180px";
+    card.setAttribute("data-lat", rec.latitude);
+    card.setAttribute("data-lng", rec.longitude);
+    [rec.price, rec.address, "The Village of " + rec.villageName,
+     (rec.listingNumber.indexOf("VNH") === 0 ? "VNH# " : "VLS# ") + rec.listingNumber.slice(3),
+     rec.status].forEach(function (line) {
+      var div = document.createElement("div");
+      div.textContent = line;
+      card.appendChild(div);
+    });
+    document.getElementById("cards").appendChild(card);
+  }
+  function load(page) {
+    var xhr = new XMLHttpRequest();
+    xhr.open("GET", "/feed?page=" + page + "&pageSize=" + PAGE_SIZE);
+    xhr.onload = function () {
+      var body = JSON.parse(xhr.responseText);
+      document.getElementById("resultCount").textContent = body.total;
+      body.results.forEach(render);
+      if (body.results.length === PAGE_SIZE) load(page + 1);
+    };
+    xhr.send();
+  }
+  load(1);
+</script>
+</body>
+</html>
+"""
+
+
+def synthetic_records(n: int, seed: int = 1) -> List[Dict]:
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        is_new = rng.random() < 0.3
+        prefix = "VNH" if is_new else "VLS"
+        records.append(
+            {
+                "listingNumber": f"{prefix}{240000 + i}",
+                "status": "Pending" if rng.random() < 0.2 else "Active",
+                "villageName": rng.choice(SAMPLE_VILLAGES),
+                "address": f"{1000 + i} Fixture Ln",
+                "price": f"${rng.randrange(200, 900) * 1000:,}",
+                "latitude": round(28.87 + rng.uniform(-0.12, 0.12), 6),
+                "longitude": round(-81.99 + rng.uniform(-0.08, 0.08), 6),
+            }
+        )
+    return records
+
+
+def load_records(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    if isinstance(payload, dict):
+        payload = payload.get("results", [])
+    return payload
+
+
+def make_handler(records: List[Dict], page_size: int, latency: float):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real host
+        disable_nagle_algorithm = True
+
+        def _send(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            url = urlparse(self.path)
+            if url.path == "/feed":
+                qs = parse_qs(url.query)
+                page = int(qs.get("page", ["1"])[0])
+                size = int(qs.get("pageSize", [str(page_size)])[0])
+                chunk = records[(page - 1) * size : page * size]
+                body = json.dumps({"total": len(records), "results": chunk})
+                self._send(body.encode("utf-8"), "application/json")
+            elif url.path.startswith("/homefinder"):
+                html = PAGE_HTML % {"page_size": page_size}
+                self._send(html.encode("utf-8"), "text/html; charset=utf-8")
+            else:
+                self.send_error(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def serve(port: int, records: List[Dict], page_size: int = 100, latency: float = 0.0):
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", port), make_handler(records, page_size, latency)
+    )
+    print(f"Serving {len(records)} listings on http://127.0.0.1:{port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--feed", help="recorded feed JSON (list or {results: [...]})")
+    parser.add_argument("--synthetic", type=int, default=2500)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    records = load_records(args.feed) if args.feed else synthetic_records(args.synthetic)
+    serve(args.port, records, args.page_size, args.latency_ms / 1000.0)
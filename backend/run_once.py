@@ -1,6 +1,11 @@
-"""Cron helper: runs a single scrape and exits."""
-from app import run_count
+"""Cron helper: runs a single scrape, compacts old history and exits.
+
+If the previous run was killed part-way (and checkpointed recently), it is
+resumed instead of starting over.
+"""
+from app import compact_history, run_count
 
 if __name__ == "__main__":
-    result = run_count()
+    result = run_count(resume=True)
     print(result)
+    compact_history()